@@ -1,9 +1,24 @@
 import os
 import sys
+import gzip
+import hmac
+import json
+import tempfile
+import time
+import zlib
 import traceback
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 
+from backend.utils.admission import (
+    AdmissionRejected, single_admission, batch_admission,
+    image_weight, zip_weight, admission_stats, busy_payload
+)
+from backend.utils.deadline import Deadline, SINGLE_DEADLINE_SECONDS, BATCH_DEADLINE_SECONDS
+from backend.utils.static_assets import StaticAssets
+from backend.utils.followup import save_followup, load_followup, discard_followup, start_purger
+from backend.utils.request_log import should_record, record_request
+
 # Add backend to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
@@ -19,18 +34,45 @@ CORS(app)
 # Increase file upload limit (50 MB)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
 
+# JSON responses smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024))
+
+# Model hot-reload: admin endpoint is disabled unless a token is set; watcher polls every N seconds (0 = off)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+MODEL_WATCH_SECONDS = float(os.environ.get("MODEL_WATCH_SECONDS", 0))
+
 # Frontend directory
 FRONTEND_PATH = os.path.join(os.path.dirname(__file__), 'frontend')
+# Fingerprinted, precompressed copy of frontend/ served from memory (restart to pick up edits)
+static_assets = StaticAssets(FRONTEND_PATH)
 
-# ✅ Import backend modules with error handling
+# ✅ Import backend modules with error handling (anything needing numpy, OpenCV or the models)
 try:
-    from backend.utils.processor import process_single_image_bytes, process_zip_bytes
+    from backend.utils.result_model import dumps, result_to_dict, results_to_dicts, indicator_catalog
+    from backend.utils.sheet import SHEET_MAX_CARDS
+    from backend.utils.model_registry import model_registry
+    from backend.utils.analytics import record_results, get_stats
+    from backend.utils.processor import process_single_image_bytes, process_zip_bytes, process_sheet_bytes
     BACKEND_IMPORTS_WORKING = True
     print("✅ Successfully imported backend modules")
 except ImportError as e:
     print(f"❌ Import Error: {e}")
     print(f"❌ Traceback: {traceback.format_exc()}")
     BACKEND_IMPORTS_WORKING = False
+    model_registry = None
+    SHEET_MAX_CARDS = 1
+
+    def dumps(payload):
+        return json.dumps(payload, default=str).encode("utf-8")
+
+    def indicator_catalog():
+        return {}
+
+    def record_results(*args, **kwargs):
+        pass
+
+    def get_stats(*args, **kwargs):
+        return {"error": "Backend modules not loaded"}
     
     # Fallback functions in case imports fail
     def process_single_image_bytes(*args, **kwargs):
@@ -47,30 +89,135 @@ except ImportError as e:
             "assessment": "ERROR"
         }]
 
+    process_sheet_bytes = process_zip_bytes
+
+# ✅ Load and warm the models in the background instead of on the first request
+if BACKEND_IMPORTS_WORKING:
+    model_registry.preload(os.environ["MODEL_PATH"])
+    if MODEL_WATCH_SECONDS > 0:
+        model_registry.watch(os.environ["MODEL_PATH"], MODEL_WATCH_SECONDS)
+
+# ✅ Expired triage uploads are removed even when no new triage request arrives
+start_purger()
+
+# ─────────────────────────────────────────────
+# 🚦 ADMISSION CONTROL
+# ─────────────────────────────────────────────
+
+def too_busy(controller, retry_after=None):
+    """Fast 429 with a Retry-After hint so clients (and load balancers) back off."""
+    payload = busy_payload(controller, retry_after)
+    response = jsonify(payload)
+    response.status_code = 429
+    response.headers["Retry-After"] = str(payload["retry_after"])
+    return response
+
+def request_deadline(default_seconds):
+    """Per-request budget: client may ask for less via X-Request-Timeout header or `timeout` form field."""
+    requested = request.headers.get("X-Request-Timeout") or request.form.get("timeout")
+    return Deadline.from_client(requested, default_seconds)
+
+# ─────────────────────────────────────────────
+# 📦 RESPONSE ENCODING
+# ─────────────────────────────────────────────
+
+def response_view():
+    """Result view requested by the client: `?compact=1` and/or `?fields=a,b,c`."""
+    compact = request.args.get("compact", "").lower() in ("1", "true", "yes")
+    fields = request.args.get("fields")
+    fields = {f.strip() for f in fields.split(",") if f.strip()} if fields else None
+    return compact, fields
+
+def json_response(payload, status=200):
+    """JSON response through the fast encoder (orjson when installed)."""
+    return app.response_class(dumps(payload), status=status, mimetype="application/json")
+
+@app.after_request
+def compress_response(response):
+    """gzip/deflate JSON bodies for clients that accept it - batch results shrink ~10x."""
+    if (response.direct_passthrough or response.mimetype != "application/json"
+            or "Content-Encoding" in response.headers):
+        return response
+
+    encoding = request.accept_encodings.best_match(["gzip", "deflate"])
+    data = response.get_data()
+    if not encoding or len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    response.set_data(gzip.compress(data, compresslevel=5) if encoding == "gzip" else zlib.compress(data, 5))
+    response.headers["Content-Encoding"] = encoding
+    response.headers.add("Vary", "Accept-Encoding")
+    return response
+
+# ─────────────────────────────────────────────
+# 📼 REQUEST RECORDING (REQUEST_LOG_ENABLED=true)
+# ─────────────────────────────────────────────
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def log_request(response):
+    """Record anonymized verification traffic for replay by backend.loadtest."""
+    if not should_record(request.method, request.path):
+        return response
+
+    # Only look at uploads the route already parsed: a fast 429 must not read the body here
+    files = request.__dict__.get("files")
+    form = request.__dict__.get("form") or {}
+    sizes = []
+    for storage in (files.values() if files else []):
+        storage.stream.seek(0, os.SEEK_END)
+        sizes.append(storage.stream.tell())
+
+    cards = g.get("cards")
+    if cards is None and response.status_code == 200:
+        cards = 1
+    record_request(
+        request.path,
+        response.status_code,
+        (time.perf_counter() - g.get("request_started", time.perf_counter())) * 1000,
+        request_bytes=request.content_length or 0,
+        files=sizes,
+        cards=cards,
+        mode=form.get("mode") or request.args.get("mode"),
+        qr=form.get("qr", "false").lower() == "true",
+    )
+    return response
+
 # ─────────────────────────────────────────────
 # 🌐 FRONTEND ROUTES
 # ─────────────────────────────────────────────
 
+def static_response(path):
+    """Serve a frontend file from the in-memory index, with ETag/304 and precompressed variants."""
+    served = static_assets.respond(
+        path,
+        version=request.args.get("v"),
+        accept_encoding=request.headers.get("Accept-Encoding"),
+        if_none_match=request.headers.get("If-None-Match"),
+    )
+    if served is None:
+        return jsonify({"error": "Not found"}), 404
+    status, headers, body = served
+    return app.response_class(body, status=status, headers=headers)
+
 @app.route("/")
 def serve_index():
-    return send_from_directory(FRONTEND_PATH, "index.html")
+    return static_response("")
 
 @app.route("/<path:page>")
 def serve_pages(page):
-    if page in ["services", "about", "contact"]:
-        return send_from_directory(FRONTEND_PATH, f"{page}.html")
-    try:
-        return send_from_directory(FRONTEND_PATH, page)
-    except:
-        return send_from_directory(FRONTEND_PATH, "index.html")
+    return static_response(page)
 
 @app.route("/css/<path:filename>")
 def serve_css(filename):
-    return send_from_directory(os.path.join(FRONTEND_PATH, "css"), filename)
+    return static_response(f"css/{filename}")
 
 @app.route("/js/<path:filename>")
 def serve_js(filename):
-    return send_from_directory(os.path.join(FRONTEND_PATH, "js"), filename)
+    return static_response(f"js/{filename}")
 
 # ─────────────────────────────────────────────
 # ⚙️ API ROUTES
@@ -84,9 +231,80 @@ def health_check():
         "backend_imports": BACKEND_IMPORTS_WORKING,
         "model_best_exists": os.path.exists(os.environ.get("MODEL_PATH", "")),
         "model_yolo_exists": os.path.exists(os.environ.get("FACE_MODEL_PATH", "")),
+        "admission": admission_stats(),
+        "model": model_registry.status() if model_registry else None,
         "service": "AadhaarVerify API"
     })
 
+@app.route("/api/indicator_codes")
+def indicator_codes():
+    """Indicator code catalog, for rendering compact results client-side."""
+    return jsonify(indicator_catalog())
+
+@app.route("/api/metrics")
+def metrics():
+    """Admission queue depth and rejection counters for autoscaling (JSON or Prometheus text)."""
+    stats = admission_stats()
+    if request.args.get("format") != "prometheus":
+        return jsonify(stats)
+
+    lines = []
+    for name in ("single", "batch"):
+        for key in ("capacity", "in_flight", "queue_depth", "admitted_total", "rejected_total"):
+            lines.append(f'aadhaar_admission_{key}{{pool="{name}",pid="{stats["pid"]}"}} {stats[name][key]}')
+    return "\n".join(lines) + "\n", 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+@app.route("/api/stats")
+def stats():
+    """Fraud statistics from pre-aggregated rollups: totals, top indicators and per-day buckets (`?days=30`)."""
+    try:
+        days = int(request.args.get("days", 30))
+    except ValueError:
+        return jsonify({"error": "days must be an integer"}), 400
+    return json_response(get_stats(days=days))
+
+@app.route("/api/admin/reload_model", methods=["POST"])
+def api_reload_model():
+    """Hot-reload best.pt: load and warm the new version in the background, optionally shadow it, then swap."""
+    token = request.headers.get("X-Admin-Token", "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+    if model_registry is None:
+        return jsonify({"error": "Backend modules not loaded"}), 503
+
+    try:
+        shadow_samples = int(request.form.get("shadow_samples", 0) or 0)
+    except ValueError:
+        return jsonify({"error": "shadow_samples must be an integer"}), 400
+
+    in_progress = (jsonify({"success": False, "error": "A model reload is already in progress",
+                            "model": model_registry.status()}), 409)
+    if model_registry.reloading:
+        return in_progress
+
+    model_path = os.environ["MODEL_PATH"]
+    upload = request.files.get("model")
+    if upload and upload.filename:
+        # Stage the upload next to best.pt; the registry promotes it only after it loads and warms up
+        fd, staged_path = tempfile.mkstemp(prefix="upload-", suffix=".pt", dir=os.path.dirname(model_path) or ".")
+        os.close(fd)
+        started = False
+        try:
+            upload.save(staged_path)
+            if os.path.getsize(staged_path) == 0:
+                return jsonify({"error": "Uploaded model file is empty"}), 400
+            started = model_registry.reload(staged_path, shadow_samples=shadow_samples, promote_to=model_path)
+        finally:
+            # Once started, the registry owns the staged file (promotes or deletes it)
+            if not started and os.path.exists(staged_path):
+                os.remove(staged_path)
+    else:
+        started = model_registry.reload(model_path, shadow_samples=shadow_samples)
+
+    if not started:
+        return in_progress
+    return jsonify({"success": True, "model": model_registry.status()}), 202
+
 @app.route("/api/verify_single", methods=["POST"])
 def api_verify_single():
     """Single Aadhaar card verification endpoint."""
@@ -98,6 +316,13 @@ def api_verify_single():
                 "message": "Processor functions are not available"
             }), 503
 
+        # Reject before the upload body is parsed when we are already saturated
+        if single_admission.saturated():
+            return too_busy(single_admission)
+
+        # Budget starts now so that time spent queued counts against it
+        deadline = request_deadline(SINGLE_DEADLINE_SECONDS)
+
         if 'front' not in request.files:
             return jsonify({"error": "Front image is required"}), 400
 
@@ -106,24 +331,204 @@ def api_verify_single():
             return jsonify({"error": "No front image selected"}), 400
 
         front_bytes = front.read()
-        
-        print("✅ Processing single image...")
-        result = process_single_image_bytes(
-            front_bytes,
-            back_bytes=None,
-            do_qr_check=False,
-            model_path=os.environ.get("MODEL_PATH", "backend/models/best.pt"),
-            device="cpu"
-        )
 
-        return jsonify({"success": True, "result": result})
+        # Optional back side: enables Secure QR + address cross-checks
+        back = request.files.get('back')
+        back_bytes = back.read() if back and back.filename else None
+        do_qr_check = request.form.get("qr", "false").lower() == "true"
+
+        # mode=triage: quick HIGH / not-HIGH verdict now, full report via /api/verify_followup
+        mode = (request.form.get("mode") or request.args.get("mode") or "full").lower()
+        if mode not in ("full", "triage"):
+            return jsonify({"error": "mode must be 'full' or 'triage'"}), 400
+
+        print(f"✅ Processing single image ({mode})...")
+        weight = image_weight(len(front_bytes), len(back_bytes or b""))
+        with single_admission.admit(weight, timeout=deadline.wait_timeout()):
+            result = process_single_image_bytes(
+                front_bytes,
+                back_bytes=back_bytes,
+                do_qr_check=do_qr_check,
+                model_path=os.environ.get("MODEL_PATH", "backend/models/best.pt"),
+                device="cpu",
+                deadline=deadline,
+                as_model=True,
+                mode=mode
+            )
+
+        compact, fields = response_view()
+        if mode == "triage":
+            # Partial verdicts stay out of analytics; the follow-up records the full result
+            payload = {"success": True, "result": result_to_dict(result, compact, fields)}
+            if not result.get("error"):
+                payload["followup_token"] = save_followup(front_bytes, back_bytes, do_qr_check)
+            return json_response(payload)
 
+        record_results([result], "single")
+        return json_response({"success": True, "result": result_to_dict(result, compact, fields)})
+
+    except AdmissionRejected as e:
+        return too_busy(single_admission, e.retry_after)
     except Exception as e:
         print(f"❌ Error in verify_single: {str(e)}")
         print(f"❌ Traceback: {traceback.format_exc()}")
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 
+@app.route("/api/verify_followup", methods=["POST"])
+def api_verify_followup():
+    """Full verification of an image previously triaged, identified by its `followup_token`."""
+    try:
+        if not BACKEND_IMPORTS_WORKING:
+            return jsonify({
+                "success": False,
+                "error": "Backend modules not loaded",
+                "message": "Processor functions are not available"
+            }), 503
+
+        if single_admission.saturated():
+            return too_busy(single_admission)
+
+        deadline = request_deadline(SINGLE_DEADLINE_SECONDS)
+
+        token = request.form.get("token") or (request.get_json(silent=True) or {}).get("token")
+        stored = load_followup(token)
+        if stored is None:
+            return jsonify({"error": "Unknown or expired followup token"}), 404
+
+        print("✅ Completing triaged verification...")
+        weight = image_weight(len(stored["front_bytes"]), len(stored["back_bytes"] or b""))
+        with single_admission.admit(weight, timeout=deadline.wait_timeout()):
+            result = process_single_image_bytes(
+                stored["front_bytes"],
+                back_bytes=stored["back_bytes"],
+                do_qr_check=stored["do_qr_check"],
+                model_path=os.environ.get("MODEL_PATH", "backend/models/best.pt"),
+                device="cpu",
+                deadline=deadline,
+                as_model=True
+            )
+        discard_followup(token)
+
+        record_results([result], "followup")
+        compact, fields = response_view()
+        return json_response({"success": True, "result": result_to_dict(result, compact, fields)})
+
+    except AdmissionRejected as e:
+        return too_busy(single_admission, e.retry_after)
+    except Exception as e:
+        print(f"❌ Error in verify_followup: {str(e)}")
+        print(f"❌ Traceback: {traceback.format_exc()}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+
+@app.route("/api/verify_dual", methods=["POST"])
+def api_verify_dual():
+    """Front + back verification: both sides processed concurrently and cross-checked."""
+    try:
+        if not BACKEND_IMPORTS_WORKING:
+            return jsonify({
+                "success": False,
+                "error": "Backend modules not loaded",
+                "message": "Processor functions are not available"
+            }), 503
+
+        if single_admission.saturated():
+            return too_busy(single_admission)
+
+        deadline = request_deadline(SINGLE_DEADLINE_SECONDS)
+
+        front = request.files.get('front')
+        back = request.files.get('back')
+        if not front or front.filename == '':
+            return jsonify({"error": "Front image is required"}), 400
+        if not back or back.filename == '':
+            return jsonify({"error": "Back image is required"}), 400
+
+        # QR check defaults to on here - the back side is where the Secure QR lives
+        do_qr_check = request.form.get("qr", "true").lower() == "true"
+
+        front_bytes = front.read()
+        back_bytes = back.read()
+
+        print("✅ Processing front and back images...")
+        weight = image_weight(len(front_bytes), len(back_bytes))
+        with single_admission.admit(weight, timeout=deadline.wait_timeout()):
+            result = process_single_image_bytes(
+                front_bytes,
+                back_bytes=back_bytes,
+                do_qr_check=do_qr_check,
+                model_path=os.environ.get("MODEL_PATH", "backend/models/best.pt"),
+                device="cpu",
+                deadline=deadline,
+                as_model=True
+            )
+
+        record_results([result], "dual")
+        compact, fields = response_view()
+        return json_response({"success": True, "result": result_to_dict(result, compact, fields)})
+
+    except AdmissionRejected as e:
+        return too_busy(single_admission, e.retry_after)
+    except Exception as e:
+        print(f"❌ Error in verify_dual: {str(e)}")
+        print(f"❌ Traceback: {traceback.format_exc()}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+
+@app.route("/api/verify_sheet", methods=["POST"])
+def api_verify_sheet():
+    """Multi-card sheet verification: every card found on one scanned page, one result per card."""
+    try:
+        if not BACKEND_IMPORTS_WORKING:
+            return jsonify({
+                "success": False,
+                "error": "Backend modules not loaded",
+                "message": "Processor functions are not available"
+            }), 503
+
+        if batch_admission.saturated():
+            return too_busy(batch_admission)
+
+        deadline = request_deadline(BATCH_DEADLINE_SECONDS)
+
+        sheet = request.files.get("sheet")
+        if not sheet or sheet.filename == '':
+            return jsonify({"error": "Sheet image is required"}), 400
+
+        sheet_bytes = sheet.read()
+        do_qr_check = request.form.get("qr", "false").lower() == "true"
+
+        print("✅ Processing multi-card sheet...")
+        # The card count is only known after splitting, so budget for a full sheet
+        weight = max(SHEET_MAX_CARDS, image_weight(len(sheet_bytes)))
+        with batch_admission.admit(weight, timeout=deadline.wait_timeout()):
+            results = process_sheet_bytes(
+                sheet_bytes,
+                do_qr_check=do_qr_check,
+                model_path=os.environ.get("MODEL_PATH", "backend/models/best.pt"),
+                device="cpu",
+                deadline=deadline,
+                as_model=True
+            )
+
+        record_results(results, "sheet")
+        g.cards = len(results)
+        compact, fields = response_view()
+        return json_response({
+            "success": True,
+            "results": results_to_dicts(results, compact, fields),
+            "cards_found": len([r for r in results if r.get("sheet_position")])
+        })
+
+    except AdmissionRejected as e:
+        return too_busy(batch_admission, e.retry_after)
+    except Exception as e:
+        print(f"❌ Error in verify_sheet: {str(e)}")
+        print(f"❌ Traceback: {traceback.format_exc()}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+
 @app.route("/api/verify_batch", methods=["POST"])
 def api_verify_batch():
     """Batch Aadhaar card verification endpoint with progress tracking."""
@@ -135,6 +540,11 @@ def api_verify_batch():
                 "message": "Processor functions are not available"
             }), 503
 
+        if batch_admission.saturated():
+            return too_busy(batch_admission)
+
+        deadline = request_deadline(BATCH_DEADLINE_SECONDS)
+
         zip_file = request.files.get("zip")
         if not zip_file or zip_file.filename == '':
             return jsonify({"error": "ZIP file is required"}), 400
@@ -148,34 +558,47 @@ def api_verify_batch():
             max_files = int(max_files)
             print(f"🔧 Processing limit set to {max_files} files")
         
-        results = process_zip_bytes(
-            zip_bytes,
-            model_path=os.environ.get("MODEL_PATH", "backend/models/best.pt"), 
-            do_qr_check=False,
-            device="cpu",
-            max_files=max_files
-        )
+        with batch_admission.admit(zip_weight(zip_bytes, max_files), timeout=deadline.wait_timeout()):
+            results = process_zip_bytes(
+                zip_bytes,
+                model_path=os.environ.get("MODEL_PATH", "backend/models/best.pt"),
+                do_qr_check=False,
+                device="cpu",
+                max_files=max_files,
+                deadline=deadline,
+                as_model=True
+            )
 
         total_files = len(results)
         valid_aadhaar = len([r for r in results if not r.get('error') or r.get('error') == 'NOT_AADHAAR'])
         non_aadhaar = len([r for r in results if r.get('error') == 'NOT_AADHAAR'])
-        errors = len([r for r in results if r.get('error') and r.get('error') != 'NOT_AADHAAR'])
+        low_quality = len([r for r in results if r.get('error') == 'LOW_QUALITY'])
+        errors = len([r for r in results if r.get('error') and r.get('error') not in ('NOT_AADHAAR', 'LOW_QUALITY')])
+        deadline_skipped = len([r for r in results if r.get('error') == 'DEADLINE_EXCEEDED'])
         
         summary = {
             "total_files_processed": total_files,
             "valid_aadhaar_cards": valid_aadhaar - non_aadhaar,
             "non_aadhaar_files": non_aadhaar,
             "processing_errors": errors,
+            "deadline_skipped": deadline_skipped,
+            "low_quality_skipped": low_quality,
+            "low_quality_rate": f"{(low_quality / total_files * 100):.1f}%" if total_files > 0 else "0%",
             "success_rate": f"{((valid_aadhaar - non_aadhaar) / total_files * 100):.1f}%" if total_files > 0 else "0%"
         }
 
-        return jsonify({
-            "success": True, 
-            "results": results,
+        record_results(results, "batch")
+        g.cards = len(results)
+        compact, fields = response_view()
+        return json_response({
+            "success": True,
+            "results": results_to_dicts(results, compact, fields),
             "summary": summary,
             "total_files": total_files
         })
 
+    except AdmissionRejected as e:
+        return too_busy(batch_admission, e.retry_after)
     except Exception as e:
         print(f"❌ Error in verify_batch: {str(e)}")
         return jsonify({"error": f"Server error: {str(e)}"}), 500
@@ -0,0 +1,235 @@
+"""
+ASGI front end for the Flask app.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8080
+
+Request bodies are received on the event loop and spooled to memory (or a
+temp file once large) without holding a thread, so a slow mobile upload
+costs an open socket rather than a worker. Only complete requests reach the
+unchanged Flask app: verification routes run on a bounded inference
+executor, everything else (pages, health, metrics) on a small separate one.
+A verification route that is already saturated is answered 429 before its
+upload is read, and again once it has arrived if the route filled up in the
+meantime; a request only reaches the inference executor when one of its
+threads is free, so work never piles up in the executor's own queue.
+Frontend files are answered straight from the in-memory static index on the
+event loop, without touching either executor.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app, static_assets, dumps
+from backend.utils.admission import single_admission, batch_admission, busy_payload, verification_threads
+from backend.utils.request_log import should_record, record_request
+
+# Verification routes and the admission controller that guards each
+VERIFY_ROUTES = {
+    "/api/verify_single": single_admission,
+    "/api/verify_dual": single_admission,
+    "/api/verify_followup": single_admission,
+    "/api/verify_sheet": batch_admission,
+    "/api/verify_batch": batch_admission,
+}
+
+# Threads parked in an admission queue are cheap; actual compute is bounded by
+# the admission capacity, so the default leaves room for every queue slot.
+INFERENCE_THREADS = int(os.environ.get("ASGI_INFERENCE_THREADS", verification_threads()))
+LIGHT_THREADS = int(os.environ.get("ASGI_LIGHT_THREADS", 4))
+
+# Bodies up to this size stay in memory; larger ones roll over to a temp file
+SPOOL_MEMORY_BYTES = int(os.environ.get("ASGI_SPOOL_MEMORY_BYTES", 1024 * 1024))
+MAX_BODY_BYTES = flask_app.config["MAX_CONTENT_LENGTH"]
+
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+light_executor = ThreadPoolExecutor(max_workers=LIGHT_THREADS, thread_name_prefix="light")
+# One slot per inference thread; taken on the event loop before submitting, released when the call returns
+inference_slots = threading.BoundedSemaphore(INFERENCE_THREADS)
+
+class BodyTooLarge(Exception):
+    pass
+
+class ClientDisconnected(Exception):
+    pass
+
+# -------------------- REQUEST BODY --------------------
+async def spool_body(receive):
+    """Receive the whole request body without blocking a thread. Returns (file, size)."""
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = 0
+    try:
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ClientDisconnected()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise BodyTooLarge()
+            body.write(chunk)
+            if not message.get("more_body", False):
+                break
+    except BaseException:
+        body.close()
+        raise
+    body.seek(0)
+    return body, size
+
+# -------------------- WSGI BRIDGE --------------------
+def wsgi_environ(scope, body, size):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(size),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1")
+        value = value.decode("latin-1")
+        if name == "content-length":
+            continue
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+            continue
+        key = "HTTP_" + name.upper().replace("-", "_")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+def call_flask(environ):
+    """Run the Flask app to completion on an executor thread. Returns (status, headers, body)."""
+    response = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = headers
+        return chunks.append
+
+    result = flask_app(environ, start_response)
+    try:
+        for chunk in result:
+            chunks.append(chunk)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return response["status"], response["headers"], b"".join(chunks)
+
+# -------------------- STATIC FILES --------------------
+def static_request(scope):
+    """(status, headers, body) for a GET/HEAD of a frontend file, or None to pass it to Flask."""
+    if scope["method"] not in ("GET", "HEAD") or scope["path"].startswith("/api/"):
+        return None
+    headers = {name: value.decode("latin-1") for name, value in scope["headers"]}
+    version = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v", [None])[0]
+    served = static_assets.respond(
+        scope["path"].lstrip("/"),
+        version=version,
+        accept_encoding=headers.get(b"accept-encoding"),
+        if_none_match=headers.get(b"if-none-match"),
+    )
+    if served is not None and scope["method"] == "HEAD":
+        served = (served[0], served[1], b"")
+    return served
+
+# -------------------- ASGI APP --------------------
+async def send_response(send, status, headers, body):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def send_json(send, status, payload, headers=()):
+    body = dumps(payload)
+    await send_response(send, status, [("Content-Type", "application/json"),
+                                       ("Content-Length", str(len(body))), *headers], body)
+
+def record_rejection(scope, status, request_bytes):
+    """Record a request answered here (it never reaches Flask); the file append runs off the event loop."""
+    if should_record(scope["method"], scope["path"]):
+        light_executor.submit(record_request, scope["path"], status, 0, request_bytes=request_bytes)
+
+async def send_busy(send, scope, controller, request_bytes):
+    payload = busy_payload(controller)
+    record_rejection(scope, 429, request_bytes)
+    await send_json(send, 429, payload, [("Retry-After", str(payload["retry_after"]))])
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            inference_executor.shutdown(wait=False)
+            light_executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    static = static_request(scope)
+    if static is not None:
+        return await send_response(send, *static)
+
+    controller = VERIFY_ROUTES.get(scope["path"]) if scope["method"] == "POST" else None
+
+    # Saturated: answer before a single byte of the upload is read
+    declared = dict(scope["headers"]).get(b"content-length")
+    declared = int(declared) if declared and declared.isdigit() else 0
+
+    if controller is not None and controller.saturated():
+        return await send_busy(send, scope, controller, declared)
+
+    if declared > MAX_BODY_BYTES:
+        record_rejection(scope, 413, declared)
+        return await send_json(send, 413, {"error": "Request body too large"})
+
+    try:
+        body, size = await spool_body(receive)
+    except BodyTooLarge:
+        record_rejection(scope, 413, declared)
+        return await send_json(send, 413, {"error": "Request body too large"})
+    except ClientDisconnected:
+        return
+
+    if controller is None:
+        executor = light_executor
+    else:
+        # The route may have filled up while a slow upload was arriving
+        if controller.saturated() or not inference_slots.acquire(blocking=False):
+            body.close()
+            return await send_busy(send, scope, controller, size)
+        executor = inference_executor
+    try:
+        status, headers, content = await asyncio.get_running_loop().run_in_executor(
+            executor, call_flask, wsgi_environ(scope, body, size)
+        )
+    finally:
+        body.close()
+        if controller is not None:
+            inference_slots.release()
+
+    await send_response(send, status, headers, content)
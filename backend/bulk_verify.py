@@ -0,0 +1,223 @@
+# backend/bulk_verify.py
+"""
+Offline bulk verification over directories and ZIP archives.
+
+    python -m backend.bulk_verify scans/ archive.zip --out results.jsonl --workers 4
+
+Results are appended to a JSONL file as they complete. The output file is
+also the checkpoint: re-running the same command skips every source already
+recorded there, so an interrupted run resumes where it stopped. With
+``--retry-errors``, sources whose latest record failed (processing error or
+deadline exceeded) are verified again.
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tiff")
+ZIP_SEPARATOR = "::"
+# Records that say nothing about the card; --retry-errors verifies their sources again
+FAILED_ASSESSMENTS = ("ERROR", "SKIPPED")
+FAILED_ERRORS = ("DEADLINE_EXCEEDED",)
+
+# -------------------- TASK DISCOVERY --------------------
+def discover_tasks(inputs):
+    """Expand files, directories and ZIPs into a sorted list of source keys."""
+    tasks = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    full = os.path.join(root, name)
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        tasks.append(full)
+                    elif name.lower().endswith(".zip"):
+                        tasks.extend(_zip_tasks(full))
+        elif path.lower().endswith(".zip"):
+            tasks.extend(_zip_tasks(path))
+        elif path.lower().endswith(IMAGE_EXTENSIONS):
+            tasks.append(path)
+        else:
+            print(f"⚠️ Skipping unsupported input: {path}")
+    return sorted(set(tasks))
+
+def _zip_tasks(zip_path):
+    try:
+        with zipfile.ZipFile(zip_path) as z:
+            return [f"{zip_path}{ZIP_SEPARATOR}{n}" for n in z.namelist() if n.lower().endswith(IMAGE_EXTENSIONS)]
+    except zipfile.BadZipFile as e:
+        print(f"⚠️ Skipping unreadable ZIP {zip_path}: {e}")
+        return []
+
+# -------------------- CHECKPOINT --------------------
+def is_failed(record):
+    return record.get("assessment") in FAILED_ASSESSMENTS or record.get("error") in FAILED_ERRORS
+
+def load_checkpoint(out_path, retry_errors=False):
+    """
+    Sources already recorded in ``out_path``; with ``retry_errors``, only those
+    whose latest record did not fail. Unreadable lines are skipped, and a torn
+    last line (an interrupted write) is cut off so appends stay valid JSONL.
+    """
+    failed = {}
+    if not os.path.exists(out_path):
+        return set()
+
+    offset = 0
+    torn_at = None
+    bad_lines = 0
+    with open(out_path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                failed[record["source"]] = is_failed(record)
+            except (ValueError, KeyError, TypeError):
+                if line.endswith(b"\n"):
+                    bad_lines += 1
+                else:
+                    torn_at = offset
+            offset += len(line)
+
+    if bad_lines:
+        print(f"⚠️ Skipped {bad_lines} unreadable records in {out_path}")
+    if torn_at is not None:
+        print(f"⚠️ Truncating incomplete record at end of {out_path}")
+        with open(out_path, "r+b") as f:
+            f.truncate(torn_at)
+    return {source for source, failure in failed.items() if not (retry_errors and failure)}
+
+# -------------------- WORKER --------------------
+_worker = {}
+
+def _init_worker(model_path, face_model_path, device, card_timeout, compact):
+    os.environ["MODEL_PATH"] = model_path
+    os.environ["FACE_MODEL_PATH"] = face_model_path
+    # Import here so the processor picks up the model paths set above
+    from backend.utils import processor
+    from backend.utils.deadline import Deadline
+    _worker.update(processor=processor, Deadline=Deadline, device=device,
+                   card_timeout=card_timeout, compact=compact, zips={})
+
+def _read_source(source):
+    if ZIP_SEPARATOR in source:
+        zip_path, member = source.split(ZIP_SEPARATOR, 1)
+        zips = _worker["zips"]
+        if zip_path not in zips:
+            zips[zip_path] = zipfile.ZipFile(zip_path)
+        return zips[zip_path].read(member)
+    with open(source, "rb") as f:
+        return f.read()
+
+def _verify_task(source):
+    started = time.monotonic()
+    processor = _worker["processor"]
+    try:
+        result = processor.process_single_image_bytes(
+            _read_source(source),
+            model_path=os.environ["MODEL_PATH"],
+            device=_worker["device"],
+            deadline=_worker["Deadline"](_worker["card_timeout"]),
+            as_model=True
+        )
+        result.filename = os.path.basename(source.split(ZIP_SEPARATOR)[-1])
+        record = result.to_dict(compact=_worker["compact"])
+    except Exception as e:
+        record = {"error": f"Processing error: {str(e)}", "assessment": "ERROR"}
+    record["source"] = source
+    record["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return record
+
+# -------------------- OUTPUT --------------------
+def write_parquet(jsonl_path, parquet_path):
+    """Flatten the JSONL results into a Parquet table (needs pyarrow or fastparquet)."""
+    try:
+        import pandas as pd
+        records = []
+        with open(jsonl_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        df = pd.json_normalize(records)
+        # A retried source has several records; keep the latest
+        if "source" in df.columns:
+            df = df.drop_duplicates("source", keep="last")
+        # Nested lists (indicators, skipped checks) are kept as JSON text columns
+        for column in df.columns:
+            if df[column].map(lambda v: isinstance(v, (list, dict))).any():
+                df[column] = df[column].map(lambda v: json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else v)
+        df.to_parquet(parquet_path, index=False)
+        print(f"✅ Parquet written to {parquet_path} ({len(df)} rows)")
+    except ImportError as e:
+        print(f"⚠️ Parquet export skipped - {e}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk Aadhaar verification over directories and ZIP archives.")
+    parser.add_argument("inputs", nargs="+", help="Image files, directories or ZIP archives")
+    parser.add_argument("--out", default="bulk_results.jsonl", help="JSONL output (also the resume checkpoint)")
+    parser.add_argument("--parquet", help="Also export the results to this Parquet file when done")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--card-timeout", type=float, default=None, help="Per-card deadline in seconds")
+    parser.add_argument("--compact", action="store_true", help="Write compact records (indicator codes, no debug text)")
+    parser.add_argument("--retry-errors", action="store_true",
+                        help="Verify again sources whose last record failed (ERROR / DEADLINE_EXCEEDED)")
+    parser.add_argument("--fsync-every", type=int, default=50, help="fsync the output every N records")
+    args = parser.parse_args(argv)
+
+    from backend.load_model import ensure_models
+    model_paths = ensure_models()
+
+    tasks = discover_tasks(args.inputs)
+    done = load_checkpoint(args.out, retry_errors=args.retry_errors)
+    pending = [t for t in tasks if t not in done]
+    print(f"📦 {len(tasks)} images found, {len(tasks) - len(pending)} already done, {len(pending)} to process")
+
+    assessments = collections.Counter()
+    processed = 0
+    started = time.monotonic()
+
+    if pending:
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(
+            processes=max(1, args.workers),
+            initializer=_init_worker,
+            initargs=(model_paths["best.pt"], model_paths["yolov8n.pt"], args.device,
+                      args.card_timeout, args.compact),
+        )
+        try:
+            with open(args.out, "a", encoding="utf-8") as out:
+                for record in pool.imap_unordered(_verify_task, pending):
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    processed += 1
+                    assessments[record.get("assessment", "UNKNOWN")] += 1
+                    if processed % args.fsync_every == 0:
+                        os.fsync(out.fileno())
+                    if processed % 100 == 0:
+                        rate = processed / (time.monotonic() - started)
+                        print(f"🔍 {processed}/{len(pending)} done ({rate:.2f} cards/s)")
+                os.fsync(out.fileno())
+            pool.close()
+        except KeyboardInterrupt:
+            print("⚠️ Interrupted - re-run the same command to resume")
+            pool.terminate()
+        finally:
+            pool.join()
+
+    elapsed = time.monotonic() - started
+    print(f"📊 Processed {processed} images in {elapsed:.1f}s "
+          f"({processed / elapsed if elapsed else 0:.2f} cards/s, {args.workers} workers)")
+    for assessment, count in assessments.most_common():
+        print(f"   - {assessment}: {count}")
+
+    if args.parquet:
+        write_parquet(args.out, args.parquet)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+# backend/loadtest.py
+"""
+Load generator for a running server: replays a recorded trace or a synthetic mix.
+
+    python -m backend.loadtest --trace backend/requests.jsonl --clients 8 --rss-match uvicorn
+    python -m backend.loadtest --mix single=9,batch=1 --clients 16 --duration 60 --images samples/
+
+Traces come from the request recorder (REQUEST_LOG_ENABLED=true). They hold
+sizes and card counts, not images, so payloads are rebuilt: from ``--images``
+(the sample closest in size to each recorded upload) or, without it, from
+synthetic card-like JPEGs. Synthetic images are cheap for the server to
+reject, so use real sample scans when the numbers feed capacity planning.
+
+By default every client sends its next request as soon as the previous one
+returns (closed loop). With ``--speed`` a trace is replayed on its recorded
+schedule (``--speed 2`` = twice as fast) and latency is measured from the
+scheduled start, so queueing in the server is not hidden by slow clients.
+"""
+import argparse
+import collections
+import http.client
+import io
+import json
+import math
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+import zipfile
+from urllib.parse import urlsplit
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+ENDPOINTS = {
+    "single": "/api/verify_single",
+    "triage": "/api/verify_single",
+    "dual": "/api/verify_dual",
+    "sheet": "/api/verify_sheet",
+    "batch": "/api/verify_batch",
+}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+DEFAULT_IMAGE_BYTES = 400 * 1024
+PERCENTILES = (50, 90, 95, 99)
+
+# -------------------- WORKLOAD --------------------
+def load_trace(path):
+    """Replayable requests from a recorder trace, in recorded order."""
+    replayable = set(ENDPOINTS.values())
+    specs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("path") in replayable:
+                specs.append(entry)
+    specs.sort(key=lambda e: e.get("ts", 0))
+    if specs:
+        start = specs[0].get("ts", 0)
+        for spec in specs:
+            spec["offset"] = spec.get("ts", start) - start
+    return specs
+
+def parse_mix(text):
+    """'single=9,batch=1' -> {'single': 9.0, 'batch': 1.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown request kind '{name}' (expected one of {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def synthetic_specs(mix, count, batch_cards, image_bytes, seed=0):
+    """``count`` request specs drawn from ``mix`` (``count=None``: endless)."""
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    n = 0
+    while count is None or n < count:
+        kind = rng.choices(kinds, weights)[0]
+        spec = {"path": ENDPOINTS[kind], "mode": "triage" if kind == "triage" else None, "qr": False}
+        if kind == "batch":
+            spec["files"], spec["cards"] = [image_bytes * batch_cards], batch_cards
+        elif kind == "dual":
+            spec["files"], spec["cards"] = [image_bytes, image_bytes], 1
+        else:
+            spec["files"], spec["cards"] = [image_bytes], 1
+        yield spec
+        n += 1
+
+# -------------------- PAYLOADS --------------------
+class PayloadFactory:
+    """Builds request bodies of recorded sizes, cached by size bucket so clients don't wait on encoding."""
+
+    def __init__(self, image_dir=None, seed=0):
+        self.samples = []
+        if image_dir:
+            for root, _, names in os.walk(image_dir):
+                for name in names:
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        with open(os.path.join(root, name), "rb") as f:
+                            self.samples.append(f.read())
+            self.samples.sort(key=len)
+            print(f"📁 {len(self.samples)} sample images from {image_dir}")
+        self.rng = np.random.default_rng(seed)
+        self._images = {}
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket(size):
+        # ~10% wide size buckets
+        return int(round(math.log(max(size, 1024), 1.1)))
+
+    def image(self, size):
+        """JPEG bytes of roughly ``size`` bytes."""
+        if self.samples:
+            sizes = [len(s) for s in self.samples]
+            return self.samples[int(np.argmin(np.abs(np.array(sizes) - size)))]
+        bucket = self._bucket(size)
+        with self._lock:
+            if bucket not in self._images:
+                self._images[bucket] = self._synthetic_image(size)
+            return self._images[bucket]
+
+    def _synthetic_image(self, size):
+        """Card-shaped JPEG (text-like blocks plus sensor noise), scaled so it encodes to about ``size`` bytes."""
+        def render(scale):
+            width, height = max(64, int(856 * scale)), max(40, int(540 * scale))
+            image = Image.new("RGB", (width, height), (232, 232, 226))
+            draw = ImageDraw.Draw(image)
+            for _ in range(80):
+                x, y = self.rng.integers(0, width), self.rng.integers(0, height)
+                draw.rectangle([x, y, x + width // 20, y + height // 40], fill=(30, 30, 30))
+            noise = self.rng.normal(0, 12, (height, width, 3))
+            pixels = np.clip(np.asarray(image, dtype=np.float32) + noise, 0, 255).astype(np.uint8)
+            out = io.BytesIO()
+            Image.fromarray(pixels).save(out, "JPEG", quality=90)
+            return out.getvalue()
+
+        probe = render(1.0)
+        # Encoded size grows with pixel count
+        scale = min(max(math.sqrt(size / len(probe)), 0.1), 8.0)
+        return render(scale)
+
+    def body(self, spec):
+        """(content_type, body bytes) for one request spec."""
+        # Requests rejected before their upload was parsed only have the total body size
+        files = spec.get("files") or [spec.get("request_bytes") or DEFAULT_IMAGE_BYTES]
+        key = (spec["path"], spec.get("mode"), bool(spec.get("qr")), spec.get("cards"),
+               tuple(self._bucket(s) for s in files))
+        with self._lock:
+            cached = self._bodies.get(key)
+        if cached is not None:
+            return cached
+
+        fields = {}
+        if spec.get("qr"):
+            fields["qr"] = "true"
+        if spec.get("mode"):
+            fields["mode"] = spec["mode"]
+
+        path = spec["path"]
+        if path == "/api/verify_batch":
+            cards = max(1, spec.get("cards") or 1)
+            uploads = [("zip", "batch.zip", "application/zip", self._zip(cards, files[0] // cards))]
+        elif path == "/api/verify_sheet":
+            uploads = [("sheet", "sheet.jpg", "image/jpeg", self.image(files[0]))]
+        elif path == "/api/verify_dual":
+            back = files[1] if len(files) > 1 else files[0]
+            uploads = [("front", "front.jpg", "image/jpeg", self.image(files[0])),
+                       ("back", "back.jpg", "image/jpeg", self.image(back))]
+        else:
+            uploads = [("front", "front.jpg", "image/jpeg", self.image(files[0]))]
+            if len(files) > 1:
+                uploads.append(("back", "back.jpg", "image/jpeg", self.image(files[1])))
+
+        built = multipart(fields, uploads)
+        with self._lock:
+            self._bodies[key] = built
+        return built
+
+    def _zip(self, cards, image_size):
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as z:
+            for i in range(cards):
+                z.writestr(f"card_{i:03d}.jpg", self.image(image_size))
+        return out.getvalue()
+
+def multipart(fields, uploads):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, content_type, data in uploads:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode() + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return f"multipart/form-data; boundary={boundary}", b"".join(parts)
+
+# -------------------- MEMORY SAMPLING --------------------
+def find_pids(match):
+    """PIDs whose command line contains ``match`` (Linux /proc)."""
+    pids = []
+    own = os.getpid()
+    for name in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not name.isdigit() or int(name) == own:
+            continue
+        try:
+            with open(f"/proc/{name}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+        except OSError:
+            continue
+        if match in cmdline and "backend.loadtest" not in cmdline:
+            pids.append(int(name))
+    return sorted(pids)
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+class RssSampler(threading.Thread):
+    """Samples the RSS of the server's worker processes every ``interval`` seconds."""
+
+    def __init__(self, pids, match, interval):
+        super().__init__(daemon=True, name="rss-sampler")
+        self.pids = list(pids)
+        self.match = match
+        self.interval = interval
+        self.samples = []  # (elapsed seconds, {pid: MB})
+        self.stopped = threading.Event()
+        self.started_at = time.monotonic()
+
+    def run(self):
+        while not self.stopped.is_set():
+            # Re-discover each time so restarted workers are picked up
+            pids = set(self.pids) | (set(find_pids(self.match)) if self.match else set())
+            sample = {pid: rss_mb(pid) for pid in sorted(pids)}
+            self.samples.append((round(time.monotonic() - self.started_at, 1),
+                                 {pid: round(mb, 1) for pid, mb in sample.items() if mb is not None}))
+            self.stopped.wait(self.interval)
+
+    def summary(self):
+        per_pid = collections.defaultdict(list)
+        for _, sample in self.samples:
+            for pid, mb in sample.items():
+                per_pid[pid].append(mb)
+        return {pid: {"start_mb": v[0], "peak_mb": max(v), "end_mb": v[-1]} for pid, v in per_pid.items()}
+
+# -------------------- CLIENTS --------------------
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = []  # (finished at, path, status, latency ms, cards)
+
+    def add(self, finished, path, status, latency_ms, cards):
+        with self.lock:
+            self.records.append((finished, path, status, latency_ms, cards))
+
+def client_loop(base_url, work, payloads, stats, stop, request_timeout):
+    parts = urlsplit(base_url)
+    conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = None
+    while not stop.is_set():
+        try:
+            spec, scheduled = work.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        if spec is None:
+            work.put((None, None))  # let the other clients see the end too
+            return
+
+        content_type, body = payloads.body(spec)
+        url = spec["path"]
+        started = scheduled or time.monotonic()
+        try:
+            if conn is None:
+                conn = conn_class(parts.hostname, parts.port, timeout=request_timeout)
+            conn.request("POST", url, body=body, headers={"Content-Type": content_type})
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            status = 0  # connection error / timeout
+            if conn is not None:
+                conn.close()
+            conn = None
+        finished = time.monotonic()
+        stats.add(finished, url, status, (finished - started) * 1000, spec.get("cards") or 1)
+
+def run_load(base_url, specs, clients, duration, speed, payloads, request_timeout):
+    """Drive ``specs`` against the server. Returns (stats, wall seconds)."""
+    work = queue.Queue(maxsize=clients * 2 if speed is None else 0)
+    stats = Stats()
+    stop = threading.Event()
+    threads = [threading.Thread(target=client_loop, daemon=True,
+                                args=(base_url, work, payloads, stats, stop, request_timeout))
+               for _ in range(clients)]
+    for t in threads:
+        t.start()
+
+    started = time.monotonic()
+    deadline = started + duration if duration else None
+    try:
+        for spec in specs:
+            now = time.monotonic()
+            if deadline and now >= deadline:
+                break
+            if speed is None:
+                # Closed loop: the bounded queue blocks until a client is free
+                work.put((spec, None))
+                continue
+            # Open loop: release each request at its recorded offset
+            due = started + spec.get("offset", 0) / speed
+            if due > now:
+                time.sleep(due - now)
+            work.put((spec, due))
+    except KeyboardInterrupt:
+        print("⏹️ Interrupted - waiting for in-flight requests")
+    work.put((None, None))
+    for t in threads:
+        t.join(timeout=request_timeout + 1)
+    stop.set()
+    return stats, time.monotonic() - started
+
+# -------------------- REPORT --------------------
+def summarize(stats, wall_seconds):
+    by_path = collections.defaultdict(list)
+    for record in stats.records:
+        by_path[record[1]].append(record)
+    by_path["ALL"] = list(stats.records)
+
+    report = {}
+    for path, records in by_path.items():
+        if not records:
+            continue
+        statuses = collections.Counter(r[2] for r in records)
+        ok = [r for r in records if 200 <= r[2] < 300]
+        latencies = np.array([r[3] for r in ok]) if ok else np.array([0.0])
+        report[path] = {
+            "requests": len(records),
+            "ok": len(ok),
+            "throughput_rps": round(len(ok) / wall_seconds, 2),
+            "cards_per_s": round(sum(r[4] for r in ok) / wall_seconds, 2),
+            "rate_429": round(statuses[429] / len(records), 4),
+            "error_rate": round(sum(n for s, n in statuses.items() if s != 429 and not 200 <= s < 300)
+                                / len(records), 4),
+            "latency_ms": {
+                **{f"p{p}": round(float(np.percentile(latencies, p)), 1) for p in PERCENTILES},
+                "max": round(float(latencies.max()), 1),
+            },
+            "statuses": {str(s): n for s, n in sorted(statuses.items())},
+        }
+    return report
+
+def print_report(report, rss, wall_seconds):
+    print(f"\n📊 {wall_seconds:.1f}s wall time")
+    header = f"{'endpoint':<22}{'reqs':>7}{'rps':>8}{'cards/s':>9}{'429%':>7}{'err%':>7}" + \
+             "".join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f"{'max':>9}"
+    print(header)
+    for path, row in report.items():
+        lat = row["latency_ms"]
+        print(f"{path:<22}{row['requests']:>7}{row['throughput_rps']:>8}{row['cards_per_s']:>9}"
+              f"{row['rate_429'] * 100:>6.1f}%{row['error_rate'] * 100:>6.1f}%"
+              + "".join(f"{lat['p' + str(p)]:>9}" for p in PERCENTILES) + f"{lat['max']:>9}")
+    if rss:
+        print("\n🧠 Worker RSS (MB)")
+        for pid, row in sorted(rss.items()):
+            print(f"   pid {pid}: start {row['start_mb']}  peak {row['peak_mb']}  end {row['end_mb']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded or synthetic verification traffic against a server.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="Server base URL")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--trace", help="Recorder trace (JSONL) to replay")
+    source.add_argument("--mix", type=parse_mix, default=None,
+                        help="Synthetic mix of single, triage, dual, sheet, batch, e.g. single=9,batch=1")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--requests", type=int, default=None, help="Synthetic mix: number of requests")
+    parser.add_argument("--loop", action="store_true", help="Trace: start over when it ends (use with --duration)")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="Trace: replay on the recorded schedule at this speed-up instead of closed loop")
+    parser.add_argument("--images", help="Directory of sample card images used as payloads")
+    parser.add_argument("--image-bytes", type=int, default=DEFAULT_IMAGE_BYTES, help="Synthetic image size")
+    parser.add_argument("--batch-cards", type=int, default=10, help="Synthetic batch size")
+    parser.add_argument("--request-timeout", type=float, default=300)
+    parser.add_argument("--pid", type=int, action="append", default=[], help="Server PID to sample RSS for")
+    parser.add_argument("--rss-match", help="Sample RSS of every process whose command line contains this")
+    parser.add_argument("--rss-interval", type=float, default=1.0)
+    parser.add_argument("--out", help="Write the full report (with RSS timeline) as JSON")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        trace = load_trace(args.trace)
+        if not trace:
+            parser.error(f"no replayable requests in {args.trace}")
+        print(f"📼 Replaying {len(trace)} recorded requests from {args.trace}")
+        specs = trace
+        if args.loop:
+            specs = (dict(spec, offset=spec["offset"] + n * (trace[-1]["offset"] + 1))
+                     for n in range(10 ** 9) for spec in trace)
+    else:
+        mix = args.mix or {"single": 1.0}
+        count = args.requests if args.requests or args.duration else 100
+        specs = synthetic_specs(mix, count, args.batch_cards, args.image_bytes)
+        print(f"🧪 Synthetic mix {mix}")
+
+    payloads = PayloadFactory(args.images)
+    sampler = None
+    if args.pid or args.rss_match:
+        sampler = RssSampler(args.pid, args.rss_match, args.rss_interval)
+        sampler.start()
+
+    print(f"🚀 {args.clients} clients against {args.url}")
+    stats, wall_seconds = run_load(args.url, specs, args.clients, args.duration, args.speed if args.trace else None,
+                                   payloads, args.request_timeout)
+    rss = None
+    if sampler:
+        sampler.stopped.set()
+        sampler.join()
+        rss = sampler.summary()
+
+    report = summarize(stats, wall_seconds)
+    print_report(report, rss, wall_seconds)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": args.url,
+                "clients": args.clients,
+                "wall_seconds": round(wall_seconds, 2),
+                "endpoints": report,
+                "rss": {str(pid): row for pid, row in (rss or {}).items()},
+                "rss_timeline": [{"t": t, **{str(pid): mb for pid, mb in sample.items()}}
+                                 for t, sample in (sampler.samples if sampler else [])],
+            }, f, indent=2)
+        print(f"💾 Report written to {args.out}")
+
+if __name__ == "__main__":
+    main()
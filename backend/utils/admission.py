@@ -0,0 +1,181 @@
+# backend/utils/admission.py
+import io
+import os
+import threading
+import time
+import zipfile
+from collections import deque
+from contextlib import contextmanager
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tiff")
+
+# One "card" of budget covers an image up to this many bytes; larger uploads cost more
+IMAGE_WEIGHT_BYTES = int(os.environ.get("ADMISSION_IMAGE_WEIGHT_BYTES", 4 * 1024 * 1024))
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted (queue full or wait deadline passed)."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """
+    Per-process in-flight budget measured in cards.
+
+    Requests acquire a weight (number of cards, scaled by image size). When the
+    budget is exhausted they wait in a small FIFO queue until a deadline; when
+    the queue itself is full they are rejected immediately so the caller can
+    answer 429 without reading or processing the upload.
+    """
+
+    def __init__(self, name, capacity, max_queue, queue_timeout):
+        self.name = name
+        self.capacity = max(1, int(capacity))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = float(queue_timeout)
+
+        self._cond = threading.Condition()
+        self._waiters = deque()
+        self._in_flight = 0
+        self._admitted = 0
+        self._rejected = {"queue_full": 0, "timeout": 0}
+        # Moving average of seconds spent per card, used for Retry-After hints
+        self._seconds_per_card = 2.0
+
+    def saturated(self):
+        """Cheap pre-check: True when a new request would be rejected outright."""
+        with self._cond:
+            if len(self._waiters) < self.max_queue:
+                return False
+            return bool(self._waiters) or self._in_flight >= self.capacity
+
+    def retry_after(self):
+        """Rough number of seconds until the current backlog drains."""
+        with self._cond:
+            return self._retry_after_locked()
+
+    def _retry_after_locked(self):
+        backlog = self._in_flight + len(self._waiters)
+        return max(1, int(round(backlog * self._seconds_per_card / self.capacity)))
+
+    def _reject_locked(self, reason):
+        self._rejected[reason] += 1
+        return AdmissionRejected(reason, self._retry_after_locked())
+
+    def acquire(self, weight, timeout=None):
+        """Reserve ``weight`` cards, waiting up to ``timeout`` seconds. Returns the granted weight."""
+        # A single oversized request may still run on its own
+        weight = min(max(1, int(weight)), self.capacity)
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+
+        with self._cond:
+            if not self._waiters and self._in_flight + weight <= self.capacity:
+                self._in_flight += weight
+                self._admitted += 1
+                return weight
+
+            if len(self._waiters) >= self.max_queue or timeout <= 0:
+                raise self._reject_locked("queue_full")
+
+            token = object()
+            self._waiters.append(token)
+            deadline = time.monotonic() + timeout
+            try:
+                while not (self._waiters[0] is token and self._in_flight + weight <= self.capacity):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject_locked("timeout")
+                    self._cond.wait(remaining)
+                self._in_flight += weight
+                self._admitted += 1
+                return weight
+            finally:
+                self._waiters.remove(token)
+                self._cond.notify_all()
+
+    def release(self, weight, elapsed=None):
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - weight)
+            if elapsed is not None:
+                self._seconds_per_card = 0.8 * self._seconds_per_card + 0.2 * (elapsed / weight)
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, weight, timeout=None):
+        granted = self.acquire(weight, timeout)
+        started = time.monotonic()
+        try:
+            yield granted
+        finally:
+            self.release(granted, time.monotonic() - started)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._waiters),
+                "max_queue": self.max_queue,
+                "admitted_total": self._admitted,
+                "rejected_total": sum(self._rejected.values()),
+                "rejected": dict(self._rejected),
+                "seconds_per_card": round(self._seconds_per_card, 3),
+            }
+
+# -------------------- REQUEST WEIGHTS --------------------
+def image_weight(*sizes):
+    """Budget cost of a single-card request: one card per image, more for large files."""
+    return sum(1 + size // IMAGE_WEIGHT_BYTES for size in sizes if size)
+
+def zip_weight(zip_bytes, max_files=None):
+    """Budget cost of a batch, read from the ZIP central directory without decompressing."""
+    try:
+        with zipfile.ZipFile(io.BytesIO(zip_bytes), "r") as z:
+            infos = [i for i in z.infolist() if i.filename.lower().endswith(IMAGE_EXTENSIONS)]
+    except zipfile.BadZipFile:
+        return 1
+    if max_files:
+        infos = infos[:max_files]
+    return max(1, image_weight(*(i.file_size for i in infos)))
+
+# -------------------- PROCESS-WIDE CONTROLLERS --------------------
+single_admission = AdmissionController(
+    "single",
+    capacity=os.environ.get("ADMISSION_SINGLE_CAPACITY", 4),
+    max_queue=os.environ.get("ADMISSION_SINGLE_QUEUE", 8),
+    queue_timeout=os.environ.get("ADMISSION_SINGLE_WAIT_SECONDS", 15),
+)
+
+batch_admission = AdmissionController(
+    "batch",
+    capacity=os.environ.get("ADMISSION_BATCH_CAPACITY", 40),
+    max_queue=os.environ.get("ADMISSION_BATCH_QUEUE", 2),
+    queue_timeout=os.environ.get("ADMISSION_BATCH_WAIT_SECONDS", 30),
+)
+
+def verification_threads():
+    """
+    Threads a server needs so every admitted or queued verification has one:
+    otherwise requests wait in the server's backlog instead of the admission
+    queue, and the queue never fills up to answer 429.
+    """
+    return single_admission.capacity + single_admission.max_queue + 1 + batch_admission.max_queue
+
+def busy_payload(controller, retry_after=None):
+    """Body of the 429 answer, shared by the Flask views and the ASGI front end."""
+    retry_after = retry_after or controller.retry_after()
+    return {
+        "success": False,
+        "error": "Server busy",
+        "message": f"Too many {controller.name} verifications in progress, retry in {retry_after}s",
+        "retry_after": retry_after
+    }
+
+def admission_stats():
+    return {
+        "pid": os.getpid(),
+        "single": single_admission.stats(),
+        "batch": batch_admission.stats(),
+    }
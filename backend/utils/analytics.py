@@ -0,0 +1,357 @@
+# backend/utils/analytics.py
+"""
+Verification analytics: pre-aggregated counters per day and per indicator code.
+
+Every recorded result is appended to a JSONL history (no personal data: only
+assessment, error, score and indicator codes) and added to rollup counters
+in SQLite, so statistics are read from a handful of rows however long the
+history grows. Requests only queue their results; a background writer thread
+does the disk and database work. Rebuild the counters from raw history with:
+
+    python -m backend.utils.analytics rebuild
+"""
+import argparse
+import atexit
+import datetime
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+from .result_model import VerificationResult, IndicatorCode, INDICATOR_CATALOG, SEVERITY_PREFIX
+
+ANALYTICS_ENABLED = os.environ.get("ANALYTICS_ENABLED", "true").lower() == "true"
+ANALYTICS_DB_PATH = os.environ.get("ANALYTICS_DB_PATH", os.path.join("backend", "analytics.sqlite3"))
+HISTORY_PATH = os.environ.get("ANALYTICS_HISTORY_PATH", os.path.join("backend", "history.jsonl"))
+# Older history written as one JSON array of {id, timestamp, results} entries with rendered indicator text
+LEGACY_HISTORY_PATH = os.path.join("backend", "history.json")
+
+TOTAL_BUCKET = "all"
+MAX_STATS_DAYS = 366
+# Results waiting for the writer thread; beyond this, new results are dropped rather than blocking requests
+RECORD_QUEUE_SIZE = int(os.environ.get("ANALYTICS_QUEUE_SIZE", 10000))
+WRITE_BATCH = 200
+
+# Error codes kept as-is in the counters; any other error text (exception messages) is one bucket
+RESULT_ERRORS = ("NOT_AADHAAR", "LOW_QUALITY", "MODEL_UNAVAILABLE", "DEADLINE_EXCEEDED", "TOO_LARGE")
+OTHER_ERROR = "PROCESSING_ERROR"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup (
+    bucket TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, metric, key)
+) WITHOUT ROWID
+"""
+
+UPSERT = """
+INSERT INTO rollup (bucket, metric, key, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (bucket, metric, key) DO UPDATE SET count = count + excluded.count
+"""
+
+_local = threading.local()
+_history_lock = threading.Lock()
+_queue = queue.Queue(maxsize=RECORD_QUEUE_SIZE)
+_writer = None
+_writer_lock = threading.Lock()
+
+def _connect(path=None):
+    """Per-thread connection; SQLite serializes writers across threads and worker processes."""
+    path = path or ANALYTICS_DB_PATH
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(SCHEMA)
+        _local.conn, _local.path = conn, path
+    return conn
+
+# -------------------- RECORDING --------------------
+def error_code(error):
+    """Bounded counter key for a result's error (None when there is none)."""
+    if not isinstance(error, str) or not error:
+        return None
+    return error if error in RESULT_ERRORS else OTHER_ERROR
+
+def summarize_result(result):
+    """The analytics view of one result: no names, numbers or images, just outcome and codes."""
+    if isinstance(result, VerificationResult):
+        indicators = result.get("indicators") or []
+        codes = sorted({ind.code.value for ind in indicators})
+        checksum_failed = any(
+            ind.code is IndicatorCode.AADHAAR_INVALID and "checksum" in str((ind.params or {}).get("status", ""))
+            for ind in indicators
+        )
+    else:
+        codes = sorted(set(result.get("indicator_codes") or []))
+        checksum_failed = False
+    return {
+        "timestamp": result.get("timestamp") or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "assessment": result.get("assessment") or "UNKNOWN",
+        "error": error_code(result.get("error")),
+        "fraud_score": result.get("fraud_score") or 0,
+        "indicator_codes": codes,
+        "checksum_failed": checksum_failed,
+        "model_version": result.get("model_version"),
+    }
+
+def _increments(summary):
+    """Counter rows (metric, key, amount) contributed by one summarized result."""
+    rows = [("results", "", 1), ("assessment", summary["assessment"], 1),
+            ("fraud_score", "sum", int(summary["fraud_score"]))]
+    if summary["error"]:
+        rows.append(("error", summary["error"], 1))
+    rows.extend(("code", code, 1) for code in summary["indicator_codes"])
+    if summary["checksum_failed"]:
+        rows.append(("flag", "checksum_failed", 1))
+    return rows
+
+def record_results(results, source="single"):
+    """Queue results for the history and the rollups. Never raises and never waits on the database."""
+    if not ANALYTICS_ENABLED or not results:
+        return
+    try:
+        entry = {
+            "id": f"{source}_{uuid.uuid4().hex[:8]}",
+            "timestamp": datetime.datetime.now().isoformat(),
+            "results": [summarize_result(r) for r in results],
+        }
+        _start_writer()
+        _queue.put_nowait(entry)
+    except queue.Full:
+        print("⚠️ Analytics queue full - results not recorded")
+    except Exception as e:
+        print(f"⚠️ Analytics recording failed: {e}")
+
+def _write_entries(entries):
+    """Append entries to the history and fold them into the rollups in one transaction."""
+    lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+    params = []
+    for entry in entries:
+        for summary in entry["results"]:
+            day = str(summary["timestamp"])[:10]
+            for metric, key, amount in _increments(summary):
+                params.append((day, metric, key, amount))
+                params.append((TOTAL_BUCKET, metric, key, amount))
+    conn = _connect()
+    with conn:
+        # History lines and counters go in under the database write lock, so a
+        # concurrent rebuild sees either both or neither
+        conn.execute("BEGIN IMMEDIATE")
+        with _history_lock:
+            with open(HISTORY_PATH, "a", encoding="utf-8") as f:
+                f.write(lines)
+        conn.executemany(UPSERT, params)
+
+def _writer_loop():
+    while True:
+        entries = [_queue.get()]
+        while len(entries) < WRITE_BATCH:
+            try:
+                entries.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            while True:
+                try:
+                    _write_entries(entries)
+                    break
+                except sqlite3.OperationalError as e:
+                    # Locked by a rebuild: wait for it rather than dropping the results
+                    if "locked" not in str(e):
+                        raise
+                    time.sleep(1)
+        except Exception as e:
+            print(f"⚠️ Analytics recording failed: {e}")
+        finally:
+            for _ in entries:
+                _queue.task_done()
+
+def _start_writer():
+    global _writer
+    # Also restarts the writer in a forked worker, where the parent's thread doesn't exist
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, daemon=True, name="analytics-writer")
+            _writer.start()
+
+def flush(timeout=5):
+    """Wait until queued results are written (or ``timeout`` seconds pass)."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+atexit.register(flush)
+
+# -------------------- QUERIES --------------------
+def _bucket_stats(counters):
+    results = counters.get(("results", ""), 0)
+
+    def group(metric):
+        return dict(sorted(
+            ((key, count) for (m, key), count in counters.items() if m == metric),
+            key=lambda item: -item[1]
+        ))
+
+    errors = group("error")
+    rate = (lambda n: round(n / results, 4)) if results else (lambda n: 0.0)
+    return {
+        "results": results,
+        "assessments": group("assessment"),
+        "errors": errors,
+        "indicators": group("code"),
+        "not_aadhaar_rate": rate(errors.get("NOT_AADHAAR", 0)),
+        "invalid_checksum_rate": rate(counters.get(("flag", "checksum_failed"), 0)),
+        "average_fraud_score": rate(counters.get(("fraud_score", "sum"), 0)),
+    }
+
+def get_stats(days=30, top=10):
+    """
+    Totals plus per-day rollups for the last ``days`` days. Reads only the
+    counter rows of the requested buckets, independent of history size.
+    """
+    days = max(0, min(int(days), MAX_STATS_DAYS))
+    today = datetime.date.today()
+    dates = [(today - datetime.timedelta(days=n)).isoformat() for n in range(days)]
+
+    buckets = {}
+    conn = _connect()
+    query = "SELECT bucket, metric, key, count FROM rollup WHERE bucket IN ({})".format(
+        ", ".join("?" * (len(dates) + 1))
+    )
+    for bucket, metric, key, count in conn.execute(query, [TOTAL_BUCKET, *dates]):
+        buckets.setdefault(bucket, {})[(metric, key)] = count
+
+    total = _bucket_stats(buckets.pop(TOTAL_BUCKET, {}))
+    return {
+        "total": total,
+        "top_indicators": dict(list(total["indicators"].items())[:top]),
+        "days": [{"date": day, **_bucket_stats(buckets[day])} for day in sorted(buckets)],
+    }
+
+# -------------------- REBUILD --------------------
+def _legacy_patterns():
+    """Regexes that map rendered indicator text from older history back to codes."""
+    patterns = []
+    for code, (severity, template) in INDICATOR_CATALOG.items():
+        text = re.escape(SEVERITY_PREFIX[severity] + template.rstrip("."))
+        text = re.sub(r"\\\{\w+\\\}", ".*?", text)
+        patterns.append((re.compile(text), code.value))
+    # Older wording that differs from the current catalog
+    patterns.append((re.compile(re.escape(SEVERITY_PREFIX["HIGH"]) + r"QR Code Error"), IndicatorCode.QR_ERROR.value))
+    return patterns
+
+def _legacy_summary(result, patterns):
+    codes = set()
+    for text in result.get("indicators") or []:
+        code = next((code for pattern, code in patterns if pattern.match(text)), None)
+        if code:
+            codes.add(code)
+    return {
+        "timestamp": result.get("timestamp") or "",
+        "assessment": result.get("assessment") or "UNKNOWN",
+        "error": result.get("error"),
+        "fraud_score": result.get("fraud_score") or 0,
+        "indicator_codes": sorted(codes),
+        "checksum_failed": any("checksum failed" in text for text in result.get("indicators") or []),
+    }
+
+def load_history(history_path=None, legacy_path=LEGACY_HISTORY_PATH):
+    """Every summarized result in the JSONL history plus the legacy JSON history, if present."""
+    rows = []
+    if legacy_path and os.path.exists(legacy_path):
+        patterns = _legacy_patterns()
+        with open(legacy_path, encoding="utf-8") as f:
+            for entry in json.load(f):
+                for result in entry.get("results", []):
+                    summary = _legacy_summary(result, patterns)
+                    summary["timestamp"] = summary["timestamp"] or entry.get("timestamp", "")
+                    rows.append(summary)
+
+    history_path = history_path or HISTORY_PATH
+    if os.path.exists(history_path):
+        with open(history_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.extend(json.loads(line)["results"])
+                except (ValueError, KeyError):
+                    continue  # torn line from an interrupted write
+    return rows
+
+def compute_rollups(rows):
+    """Vectorized recomputation of every counter row (bucket, metric, key, count) from summaries."""
+    import pandas as pd
+
+    if not rows:
+        return []
+    df = pd.DataFrame(rows)
+    df["bucket"] = df["timestamp"].astype(str).str[:10]
+    df = pd.concat([df, df.assign(bucket=TOTAL_BUCKET)], ignore_index=True)
+    # Older history stored raw error text; count it under the same bounded codes
+    df["error"] = [error_code(error) for error in df.get("error", [None] * len(df))]
+    df["fraud_score"] = pd.to_numeric(df["fraud_score"], errors="coerce").fillna(0).astype(int)
+
+    def counts(frame, metric, key_column):
+        out = frame.groupby(["bucket", key_column]).size().reset_index(name="count")
+        return out.rename(columns={key_column: "key"}).assign(metric=metric)
+
+    codes = df[["bucket", "indicator_codes"]].explode("indicator_codes").dropna()
+    checksum = df[df["checksum_failed"].fillna(False).astype(bool)]
+    parts = [
+        df.groupby("bucket").size().reset_index(name="count").assign(metric="results", key=""),
+        counts(df, "assessment", "assessment"),
+        counts(df.dropna(subset=["error"]), "error", "error"),
+        counts(codes, "code", "indicator_codes"),
+        checksum.groupby("bucket").size().reset_index(name="count").assign(metric="flag", key="checksum_failed"),
+        df.groupby("bucket")["fraud_score"].sum().reset_index(name="count").assign(metric="fraud_score", key="sum"),
+    ]
+    table = pd.concat(parts, ignore_index=True)
+    return list(table[["bucket", "metric", "key", "count"]].itertuples(index=False, name=None))
+
+def rebuild(history_path=None, legacy_path=LEGACY_HISTORY_PATH, db_path=None):
+    """
+    Recompute all rollups from raw history, replacing the counters in one transaction.
+
+    The history is read after taking the database write lock, which recorders
+    also hold while appending, so results recorded by a running server are
+    counted exactly once. The writer thread holds queued results until it ends.
+    """
+    conn = _connect(db_path)
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = compute_rollups(load_history(history_path, legacy_path))
+        conn.execute("DELETE FROM rollup")
+        conn.executemany(
+            "INSERT INTO rollup (bucket, metric, key, count) VALUES (?, ?, ?, ?)",
+            [(b, m, str(k), int(c)) for b, m, k, c in rows]
+        )
+    return len(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verification analytics maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = sub.add_parser("rebuild", help="Recompute rollups from raw history (backfill)")
+    rebuild_parser.add_argument("--history", default=HISTORY_PATH)
+    rebuild_parser.add_argument("--legacy", default=LEGACY_HISTORY_PATH)
+    rebuild_parser.add_argument("--db", default=ANALYTICS_DB_PATH)
+    sub.add_parser("stats", help="Print the current totals")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        count = rebuild(args.history, args.legacy, args.db)
+        print(f"✅ Rebuilt {count} rollup counters into {args.db}")
+    else:
+        print(json.dumps(get_stats(days=7), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# backend/utils/deadline.py
+import os
+import time
+
+# Server-side defaults and ceilings (seconds); clients may ask for less, never more
+SINGLE_DEADLINE_SECONDS = float(os.environ.get("SINGLE_DEADLINE_SECONDS", 45))
+BATCH_DEADLINE_SECONDS = float(os.environ.get("BATCH_DEADLINE_SECONDS", 280))
+
+# Minimum budget an optional stage needs before it is worth starting
+FACE_MIN_SECONDS = float(os.environ.get("DEADLINE_FACE_MIN_SECONDS", 1.5))
+QR_MIN_SECONDS = float(os.environ.get("DEADLINE_QR_MIN_SECONDS", 1.0))
+OCR_MIN_SECONDS = float(os.environ.get("DEADLINE_OCR_MIN_SECONDS", 0.5))
+
+# Smallest per-call timeout handed out: pytesseract reads 0 as "no timeout", so an
+# exhausted budget must still yield a positive value (the call then fails fast)
+CALL_MIN_SECONDS = 0.05
+
+# Floor for client-supplied budgets, so a tiny X-Request-Timeout can't skip every check
+CLIENT_MIN_SECONDS = float(os.environ.get("DEADLINE_CLIENT_MIN_SECONDS", 5))
+
+class Deadline:
+    """
+    Wall-clock budget for one request, shared by every pipeline stage.
+
+    Stages ask for ``timeout(cap)`` instead of using a fixed timeout, so the
+    sum of all Tesseract/YOLO calls can never exceed the request budget.
+    A Deadline created with ``seconds=None`` never expires.
+    """
+
+    __slots__ = ("budget", "_expires_at")
+
+    def __init__(self, seconds=None):
+        self.budget = seconds
+        self._expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    @classmethod
+    def from_client(cls, value, default, maximum=None):
+        """
+        Build from a client-supplied number of seconds, clamped between
+        CLIENT_MIN_SECONDS and ``maximum`` (default: ``default``).
+        """
+        maximum = default if maximum is None else maximum
+        try:
+            seconds = float(value) if value not in (None, "") else default
+        except (TypeError, ValueError):
+            seconds = default
+        if seconds != seconds:  # NaN
+            seconds = default
+        return cls(min(max(seconds, CLIENT_MIN_SECONDS), maximum))
+
+    def remaining(self):
+        if self._expires_at is None:
+            return float("inf")
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def wait_timeout(self):
+        """Remaining seconds for blocking waits, or None when there is no deadline."""
+        return None if self._expires_at is None else self.remaining()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def allows(self, seconds):
+        """True if at least ``seconds`` of budget are left."""
+        return self.remaining() >= seconds
+
+    def timeout(self, cap):
+        """Per-call timeout: the stage cap, shortened to whatever budget is left (never 0)."""
+        return max(CALL_MIN_SECONDS, min(cap, self.remaining()))
+
+# Shared no-op deadline so callers that don't pass one behave as before
+NO_DEADLINE = Deadline()
@@ -0,0 +1,92 @@
+# backend/utils/followup.py
+import json
+import os
+import re
+import secrets
+import threading
+import time
+
+# Uploads kept after a triage verdict so the full report can be produced later without a re-upload.
+# Stored on disk (not in memory) so any worker process on the host can complete the follow-up.
+FOLLOWUP_DIR = os.path.join(os.environ.get("UPLOAD_DIR", os.path.join("backend", "uploads")), "followup")
+FOLLOWUP_TTL_SECONDS = float(os.environ.get("FOLLOWUP_TTL_SECONDS", 900))
+# Expired uploads are removed by a background purge, keeping directory scans off the request path
+FOLLOWUP_PURGE_SECONDS = float(os.environ.get("FOLLOWUP_PURGE_SECONDS", min(FOLLOWUP_TTL_SECONDS, 60)))
+
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{22}$")
+PARTS = ("front", "back", "meta")
+
+def _path(token, part):
+    return os.path.join(FOLLOWUP_DIR, f"{token}.{part}")
+
+def _write(path, data):
+    """Write-then-rename, so a concurrent reader never sees a half-written file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def save_followup(front_bytes, back_bytes=None, do_qr_check=False):
+    """Keep the uploads of a triaged request and return the token that completes it."""
+    os.makedirs(FOLLOWUP_DIR, exist_ok=True)
+    token = secrets.token_urlsafe(16)
+    _write(_path(token, "front"), front_bytes)
+    if back_bytes:
+        _write(_path(token, "back"), back_bytes)
+    meta = {"created": time.time(), "do_qr_check": do_qr_check}
+    # Meta is written last: a token is only valid once its images are complete
+    _write(_path(token, "meta"), json.dumps(meta).encode("utf-8"))
+    return token
+
+def load_followup(token):
+    """The stored request {front_bytes, back_bytes, do_qr_check}, or None if unknown or expired."""
+    if not token or not TOKEN_PATTERN.match(token):
+        return None
+    try:
+        with open(_path(token, "meta"), "rb") as f:
+            meta = json.loads(f.read())
+        if time.time() - meta["created"] > FOLLOWUP_TTL_SECONDS:
+            discard_followup(token)
+            return None
+        with open(_path(token, "front"), "rb") as f:
+            front_bytes = f.read()
+        back_path = _path(token, "back")
+        back_bytes = None
+        if os.path.exists(back_path):
+            with open(back_path, "rb") as f:
+                back_bytes = f.read()
+    except (OSError, ValueError, KeyError):
+        return None
+    return {"front_bytes": front_bytes, "back_bytes": back_bytes, "do_qr_check": meta.get("do_qr_check", False)}
+
+def discard_followup(token):
+    for part in PARTS:
+        try:
+            os.remove(_path(token, part))
+        except OSError:
+            pass
+
+def purge_expired():
+    """Delete stored uploads older than the TTL (also leftovers of interrupted writes)."""
+    cutoff = time.time() - FOLLOWUP_TTL_SECONDS
+    try:
+        names = os.listdir(FOLLOWUP_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(FOLLOWUP_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def start_purger(interval=FOLLOWUP_PURGE_SECONDS):
+    """Purge expired uploads every ``interval`` seconds in a daemon thread (0 disables it)."""
+    if interval <= 0:
+        return
+    def run():
+        while True:
+            time.sleep(interval)
+            purge_expired()
+    threading.Thread(target=run, daemon=True, name="followup-purge").start()
@@ -0,0 +1,292 @@
+# backend/utils/model_registry.py
+import datetime
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from ultralytics import YOLO
+    YOLO_AVAILABLE = True
+except ImportError:
+    YOLO_AVAILABLE = False
+
+# Share of live requests mirrored to a candidate model while it is being shadowed
+SHADOW_FRACTION = float(os.environ.get("MODEL_SHADOW_FRACTION", 0.2))
+SHADOW_TIMEOUT_SECONDS = float(os.environ.get("MODEL_SHADOW_TIMEOUT_SECONDS", 600))
+# Shadow samples for reloads started by the file watcher (0 = swap right after warm-up)
+WATCH_SHADOW_SAMPLES = int(os.environ.get("MODEL_WATCH_SHADOW_SAMPLES", 0))
+
+def file_version(path):
+    """Short content hash of a model file, used as its version."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+class ModelSet:
+    """The field detector (best.pt) and face model that serve one model version."""
+    __slots__ = ("custom", "general", "device", "version", "path", "loaded_at")
+
+    def __init__(self, custom, general, device, version=None, path=None):
+        self.custom = custom
+        self.general = general
+        self.device = device
+        self.version = version
+        self.path = path
+        self.loaded_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def resolve_model_path(model_path=None):
+    if model_path and os.path.exists(model_path):
+        return model_path
+    # Fallback to MODEL_PATH environment variable (set in app.py)
+    return os.environ.get("MODEL_PATH", os.path.join("backend", "models", "best.pt"))
+
+def load_model_set(model_path, device="cpu"):
+    """Load the fine-tuned field detector and the general YOLO model used for faces. Raises on failure."""
+    face_model_path = os.environ.get("FACE_MODEL_PATH", os.path.join("backend", "models", "yolov8n.pt"))
+    custom_model = YOLO(model_path)
+    general_model = YOLO(face_model_path)
+    custom_model.to(device)
+    general_model.to(device)
+    return ModelSet(custom_model, general_model, device, file_version(model_path), model_path)
+
+def warm_up(model_set):
+    """One dummy inference per model so the first real request doesn't pay for lazy initialisation."""
+    blank = np.zeros((640, 640, 3), dtype=np.uint8)
+    model_set.custom(blank, device=model_set.device, verbose=False)
+    model_set.general(blank, classes=[0], device=model_set.device, verbose=False)
+
+class _Shadow:
+    """Latency/agreement samples for a candidate model run next to the active one."""
+    __slots__ = ("candidate", "target", "active_ms", "candidate_ms", "agreements", "done")
+
+    def __init__(self, candidate, target):
+        self.candidate = candidate
+        self.target = target
+        self.active_ms = []
+        self.candidate_ms = []
+        self.agreements = 0
+        self.done = threading.Event()
+
+    def report(self):
+        samples = len(self.candidate_ms)
+        if not samples:
+            return {"samples": 0}
+        return {
+            "samples": samples,
+            "active_p50_ms": round(float(np.median(self.active_ms)), 1),
+            "candidate_p50_ms": round(float(np.median(self.candidate_ms)), 1),
+            "active_p95_ms": round(float(np.percentile(self.active_ms, 95)), 1),
+            "candidate_p95_ms": round(float(np.percentile(self.candidate_ms, 95)), 1),
+            "field_agreement": round(self.agreements / samples, 3),
+        }
+
+def _field_labels(model, result):
+    return sorted(model.names[int(box.cls[0])] for box in result.boxes)
+
+class ModelRegistry:
+    """
+    Process-wide holder of the active ModelSet.
+
+    Requests take a reference to the active set once and use it to the end,
+    so a reload can swap in a new version at any time: in-flight requests
+    finish on the old models, which are freed when the last one returns.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = None
+        self._shadow = None
+        self._reloading = False
+        self._last_reload = None
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-shadow")
+        # Held while a shadow sample runs; taken without blocking from request threads
+        self._shadow_slot = threading.Semaphore(1)
+        self._load_error = None
+
+    def active(self, model_path=None, device="cpu"):
+        """
+        The current ModelSet, loading it on first use. None if loading failed:
+        the failure is remembered, so requests don't retry a broken model each
+        time; a reload (admin endpoint or file watcher) clears it.
+        """
+        model_set = self._active
+        if model_set is not None or self._load_error is not None:
+            return model_set
+        with self._lock:
+            if self._active is None and self._load_error is None:
+                try:
+                    self._active = load_model_set(resolve_model_path(model_path), device)
+                    print(f"✅ Model version {self._active.version} loaded")
+                except Exception as e:
+                    self._load_error = str(e)
+                    print(f"⚠️ Model loading error: {e}")
+            return self._active
+
+    def preload(self, model_path=None, device="cpu"):
+        """Load and warm the models in the background so the first request doesn't start cold."""
+        def run():
+            model_set = self.active(model_path, device)
+            if model_set is not None:
+                try:
+                    warm_up(model_set)
+                except Exception as e:
+                    print(f"⚠️ Model warm-up failed: {e}")
+        threading.Thread(target=run, daemon=True, name="model-preload").start()
+
+    # -------------------- RELOAD --------------------
+    @property
+    def reloading(self):
+        return self._reloading
+
+    def reload(self, model_path=None, shadow_samples=0, promote_to=None):
+        """
+        Start loading a new model version in the background. Returns False if one is already loading.
+
+        With ``promote_to``, ``model_path`` is a staged upload: it is moved over
+        ``promote_to`` only once it has loaded and warmed up, and deleted if it
+        fails, so a bad upload never becomes the on-disk model.
+        """
+        with self._lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+        threading.Thread(
+            target=self._reload, args=(resolve_model_path(model_path), shadow_samples, promote_to),
+            daemon=True, name="model-reload"
+        ).start()
+        return True
+
+    def _reload(self, model_path, shadow_samples, promote_to=None):
+        status = {"path": promote_to or model_path, "state": "loading",
+                  "requested_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        self._last_reload = status
+        promoted = False
+        try:
+            current = self._active
+            candidate = load_model_set(model_path, current.device if current else "cpu")
+            status["version"] = candidate.version
+            if current is not None and candidate.version == current.version:
+                status["state"] = "unchanged"
+                return
+
+            status["state"] = "warming_up"
+            started = time.monotonic()
+            warm_up(candidate)
+            status["warmup_seconds"] = round(time.monotonic() - started, 2)
+
+            if shadow_samples > 0 and current is not None:
+                status["state"] = "shadowing"
+                shadow = _Shadow(candidate, shadow_samples)
+                self._shadow = shadow
+                shadow.done.wait(SHADOW_TIMEOUT_SECONDS)
+                self._shadow = None
+                status["shadow"] = shadow.report()
+
+            if promote_to:
+                # Atomic rename: other workers' watchers never see a partial or unverified model
+                os.replace(model_path, promote_to)
+                candidate.path = promote_to
+                promoted = True
+
+            # A single reference assignment: requests already running keep the old set
+            self._active = candidate
+            self._load_error = None
+            status["state"] = "active"
+            print(f"🔁 Model version {candidate.version} is now active "
+                  f"(was {current.version if current else 'none'})")
+        except Exception as e:
+            status["state"] = "failed"
+            status["error"] = str(e)
+            print(f"❌ Model reload failed, keeping the current version: {e}")
+        finally:
+            if promote_to and not promoted:
+                try:
+                    os.remove(model_path)
+                except OSError:
+                    pass
+            status["finished_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._reloading = False
+
+    # -------------------- SHADOW TRAFFIC --------------------
+    def shadow(self, img_np):
+        """Mirror a sample of live front images to a candidate being shadowed, off the request path."""
+        shadow = self._shadow
+        if shadow is None or shadow.done.is_set() or random.random() >= SHADOW_FRACTION:
+            return
+        # Never build a backlog: drop the sample if the previous one is still running
+        if not self._shadow_slot.acquire(blocking=False):
+            return
+        try:
+            self._shadow_executor.submit(self._shadow_run, shadow, self._active, img_np)
+        except Exception:
+            self._shadow_slot.release()
+            raise
+
+    def _shadow_run(self, shadow, active, img_np):
+        try:
+            started = time.monotonic()
+            active_result = active.custom(img_np, device=active.device, conf=0.25, verbose=False)[0]
+            middle = time.monotonic()
+            candidate = shadow.candidate
+            candidate_result = candidate.custom(img_np, device=candidate.device, conf=0.25, verbose=False)[0]
+            finished = time.monotonic()
+
+            shadow.active_ms.append((middle - started) * 1000)
+            shadow.candidate_ms.append((finished - middle) * 1000)
+            if _field_labels(active.custom, active_result) == _field_labels(candidate.custom, candidate_result):
+                shadow.agreements += 1
+            if len(shadow.candidate_ms) >= shadow.target:
+                shadow.done.set()
+        except Exception as e:
+            print(f"⚠️ Shadow run failed: {e}")
+        finally:
+            self._shadow_slot.release()
+
+    # -------------------- FILE WATCH --------------------
+    def watch(self, model_path, interval):
+        """Reload whenever ``model_path`` changes on disk (e.g. a new best.pt copied in by a deploy job)."""
+        def run():
+            seen = _file_stamp(model_path)
+            while True:
+                time.sleep(interval)
+                stamp = _file_stamp(model_path)
+                if stamp is None or stamp == seen:
+                    continue
+                # Wait until the file stops changing so a half-copied model is never loaded
+                time.sleep(interval)
+                if _file_stamp(model_path) != stamp:
+                    continue
+                seen = stamp
+                current = self._active
+                if current is None or file_version(model_path) != current.version:
+                    print(f"🔁 {model_path} changed - reloading model")
+                    self.reload(model_path, shadow_samples=WATCH_SHADOW_SAMPLES)
+        threading.Thread(target=run, daemon=True, name="model-watch").start()
+
+    def status(self):
+        active = self._active
+        return {
+            "version": active.version if active else None,
+            "path": active.path if active else None,
+            "device": active.device if active else None,
+            "loaded_at": active.loaded_at if active else None,
+            "load_error": self._load_error,
+            "reloading": self._reloading,
+            "last_reload": dict(self._last_reload) if self._last_reload else None,
+        }
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+model_registry = ModelRegistry()
@@ -0,0 +1,46 @@
+# backend/utils/montage.py
+import numpy as np
+from PIL import Image
+
+# White gap between stacked crops, large enough that Tesseract never joins two fields into one line
+MONTAGE_GAP = 40
+MONTAGE_MARGIN = 20
+
+def build_montage(crops):
+    """
+    Stack preprocessed (grayscale) field crops into one canvas.
+
+    ``crops`` is a list of (key, image) pairs; keys are opaque (a field label,
+    or (card, label) for several cards). Returns (canvas, placements) where
+    placements are (key, top, bottom) row bands in canvas coordinates.
+    """
+    width = max(img.width for _, img in crops) + 2 * MONTAGE_MARGIN
+    height = sum(img.height for _, img in crops) + MONTAGE_GAP * (len(crops) - 1) + 2 * MONTAGE_MARGIN
+    canvas = Image.new("L", (width, height), 255)
+
+    placements = []
+    top = MONTAGE_MARGIN
+    for key, img in crops:
+        canvas.paste(img.convert("L"), (MONTAGE_MARGIN, top))
+        placements.append((key, top, top + img.height))
+        top += img.height + MONTAGE_GAP
+    return canvas, placements
+
+def assign_words(data, placements):
+    """
+    Map an ``image_to_data`` result back to the crops it came from.
+
+    Each word goes to the band containing its vertical centre; words keep
+    Tesseract's reading order. Returns {key: text} for keys that got text.
+    """
+    bands = np.array([(top, bottom) for _, top, bottom in placements])
+    words = {}
+    for text, top, height in zip(data["text"], data["top"], data["height"]):
+        text = text.strip()
+        if not text:
+            continue
+        centre = top + height / 2
+        hit = np.nonzero((bands[:, 0] <= centre) & (centre <= bands[:, 1]))[0]
+        if len(hit):
+            words.setdefault(placements[hit[0]][0], []).append(text)
+    return {key: " ".join(parts) for key, parts in words.items()}
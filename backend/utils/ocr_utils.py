@@ -1,11 +1,12 @@
 # backend/utils/ocr_utils.py
-import io
 import os
 import platform
 import pytesseract
 import re
 from PIL import Image, ImageEnhance, ImageFilter
 
+from .image_io import decode_image, IMAGE_MAX_DIM
+
 # --- Configure Tesseract path based on environment ---
 if platform.system() == "Windows":
     try:
@@ -17,9 +18,9 @@ elif platform.system() in ["Linux", "Darwin"]:
     if os.path.exists("/usr/bin/tesseract"):
         pytesseract.pytesseract.tesseract_cmd = "/usr/bin/tesseract"
 
-def pil_from_bytes(image_bytes):
-    """Converts raw image bytes into a PIL image."""
-    return Image.open(io.BytesIO(image_bytes)).convert("RGB")
+def pil_from_bytes(image_bytes, max_dim=IMAGE_MAX_DIM):
+    """Converts raw image bytes into an upright RGB PIL image, at most ``max_dim`` on the long side."""
+    return decode_image(image_bytes, max_dim)
 
 def preprocess_for_ocr(image_pil):
     """Apply preprocessing to improve OCR quality."""
@@ -7,7 +7,9 @@ import json
 import cv2
 import numpy as np
 import tempfile
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance, ImageFilter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from difflib import SequenceMatcher
+from PIL import Image, ImageEnhance, ImageFilter
 os.environ["OMP_NUM_THREADS"] = "1"
 os.environ["MKL_NUM_THREADS"] = "1"
 
@@ -16,6 +18,14 @@ MODEL_PATH = os.environ.get("MODEL_PATH", os.path.join("backend", "models", "bes
 FACE_MODEL_PATH = os.environ.get("FACE_MODEL_PATH", os.path.join("backend", "models", "yolov8n.pt"))
 UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join("backend", "uploads"))
 
+# "field": one Tesseract call per field crop; "montage": one call per card (or per sheet)
+OCR_MODE = os.environ.get("OCR_MODE", "field").lower()
+
+# Fraud score at which a card is assessed HIGH
+HIGH_RISK_SCORE = 3
+# Checks a card can't be cleared without: skipping one for the deadline makes the result INCOMPLETE
+ESSENTIAL_CHECKS = ("aadhaar_detection", "number_ocr", "face_detection")
+
 # Ensure upload directory exists
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -43,6 +53,14 @@ except ImportError:
     PYAADHAAR_AVAILABLE = False
     print("⚠️ PyAadhaar not available - QR decoding disabled")
 
+from .deadline import NO_DEADLINE, FACE_MIN_SECONDS, QR_MIN_SECONDS, OCR_MIN_SECONDS
+from .result_model import VerificationResult, Indicator, IndicatorCode, to_jsonable
+from .quality import assess_image_quality, QUALITY_GATE_ENABLED
+from .sheet import split_sheet, SHEET_IMAGE_MAX_DIM
+from .montage import build_montage, assign_words
+from .image_io import decode_image
+from .model_registry import model_registry
+
 # Import verification rules
 try:
     from .verification_rules import (
@@ -55,11 +73,14 @@ except ImportError:
     print("⚠️ Verification rules not available")
 
 # -------------------- AADHAAR IMAGE VERIFICATION --------------------
-def is_aadhaar_image(image_bytes):
-    """Verify if the uploaded image is actually an Aadhaar card."""
+def is_aadhaar_image(image_bytes, deadline=NO_DEADLINE):
+    """Verify if the uploaded image (bytes, or an already decoded PIL image) is actually an Aadhaar card."""
     try:
-        # Convert bytes to PIL Image
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+        # Convert bytes to PIL Image (decoded straight at the check resolution)
+        if isinstance(image_bytes, Image.Image):
+            image = image_bytes.convert("RGB")
+        else:
+            image = decode_image(image_bytes, max_dim=1280)
 
         # Smart resize: keep detail but limit memory
         max_dim = 1280  # limit for Render safety but good OCR detail
@@ -71,8 +92,8 @@ def is_aadhaar_image(image_bytes):
 
         img_np = np.array(image)
 
-        # Basic checks without OCR if Tesseract not available
-        if not TESSERACT_AVAILABLE:
+        # Basic checks without OCR if Tesseract not available (or no budget left for it)
+        if not TESSERACT_AVAILABLE or not deadline.allows(OCR_MIN_SECONDS):
             width, height = image.size
             aspect_ratio = width / height
             valid_aspect = 1.5 <= aspect_ratio <= 2.0
@@ -81,13 +102,16 @@ def is_aadhaar_image(image_bytes):
             
             confidence = 50 if valid_aspect and valid_size else 20
             
-            return confidence >= 50, confidence, {
+            details = {
                 "keywords_found": 0,
                 "aadhaar_numbers_found": 0,
                 "aspect_ratio_valid": valid_aspect,
                 "size_valid": valid_size,
-                "detected_text_snippets": "OCR not available"
+                "detected_text_snippets": "OCR not available" if not TESSERACT_AVAILABLE else "OCR skipped (deadline)"
             }
+            if TESSERACT_AVAILABLE:
+                details["ocr_skipped"] = "deadline"
+            return confidence >= 50, confidence, details
 
         # ✅ Environment-safe paths for Render
         os.environ["TESSDATA_PREFIX"] = "/usr/share/tesseract-ocr/4.00/tessdata"
@@ -96,7 +120,7 @@ def is_aadhaar_image(image_bytes):
         # Heuristic 1: Aadhaar-specific text patterns
         processed_img = preprocess_for_ocr_full(image)
         text = pytesseract.image_to_string(
-            processed_img, config="--psm 6 --oem 1", timeout=10
+            processed_img, config="--psm 6 --oem 1", timeout=deadline.timeout(10)
         ).lower()
 
         aadhaar_keywords = [
@@ -162,10 +186,12 @@ def preprocess_for_ocr(crop):
     gray = gray.resize((int(width * 2.0), int(height * 2.0)), Image.Resampling.LANCZOS)
     return gray
 
-def ocr_text(image, label):
+def ocr_text(image, label, deadline=NO_DEADLINE):
     """OCR text extraction, configured for cropped fields."""
     if not TESSERACT_AVAILABLE:
         return f"OCR_{label}"  # Mock fallback
+    if not deadline.allows(OCR_MIN_SECONDS):
+        return ""
     
     label_lower = label.lower()
     
@@ -178,12 +204,56 @@ def ocr_text(image, label):
     
     # Safe OCR with timeout
     try:
-        text = pytesseract.image_to_string(image, config=config, timeout=10)
+        text = pytesseract.image_to_string(image, config=config, timeout=deadline.timeout(10))
     except Exception as e:
         print(f"⚠️ OCR timeout for {label}: {e}")
         return ""
     return text.strip().replace('\n', ' ')
 
+def _aadhaar_checksum_ok(text):
+    digits = re.sub(r'\D', '', correct_aadhaar_number(text))
+    if VERIFICATION_RULES_AVAILABLE:
+        return validate_aadhaar_number(digits) == "Valid"
+    return len(digits) == 12
+
+def ocr_fields_montage(field_crops, deadline=NO_DEADLINE):
+    """
+    OCR many preprocessed field crops with a single Tesseract call.
+
+    ``field_crops`` is a list of (key, label, crop); the crops are stacked on
+    one canvas, read with one ``image_to_data`` pass and the words mapped back
+    by position. Returns {key: text}. The number field is re-read on its own
+    with the digit whitelist only when the montage text fails the checksum.
+    """
+    if not field_crops:
+        return {}
+    if not TESSERACT_AVAILABLE:
+        return {key: f"OCR_{label}" for key, label, _ in field_crops}  # Mock fallback
+
+    canvas, placements = build_montage([(i, crop) for i, (_, _, crop) in enumerate(field_crops)])
+    reread_number = True
+    try:
+        data = pytesseract.image_to_data(
+            canvas, config="--psm 4", output_type=pytesseract.Output.DICT,
+            timeout=deadline.timeout(10 + 2 * len(field_crops))
+        )
+        by_index = assign_words(data, placements)
+    except Exception as e:
+        print(f"⚠️ Montage OCR failed, reading fields one by one: {e}")
+        by_index = {i: ocr_text(crop, label, deadline) for i, (_, label, crop) in enumerate(field_crops)}
+        reread_number = False
+
+    texts = {}
+    for i, (key, label, crop) in enumerate(field_crops):
+        text = by_index.get(i, "")
+        label_lower = label.lower()
+        is_number = 'aadhaar' in label_lower or 'number' in label_lower
+        if reread_number and is_number and not _aadhaar_checksum_ok(text):
+            text = ocr_text(crop, label, deadline) or text
+        if text:
+            texts[key] = text
+    return texts
+
 # -------------------- QR CODE DECODING --------------------
 def decode_secure_qr(image_np):
     """Decodes the Secure QR code from a NumPy image array."""
@@ -269,136 +339,404 @@ def correct_aadhaar_number(ocr_aadhaar_num):
     
     return cleaned_num
 
-# -------------------- MAIN PROCESSING --------------------
-def process_single_image_bytes(front_bytes, back_bytes=None, do_qr_check=False, model_path=None, device="cpu"):
+# -------------------- BACK SIDE & CROSS-FIELD CHECKS --------------------
+def extract_address_from_text(back_text):
+    """Pull the address block and PIN code out of back-side OCR text."""
+    if not back_text:
+        return {"address": "", "pincode": ""}
+
+    # Address follows the "Address:" label; the UID printed below it ends the block
+    match = re.search(r'address\s*[:\-]?\s*(.*)', back_text, re.IGNORECASE | re.DOTALL)
+    address = match.group(1) if match else back_text
+    address = re.split(r'\b\d{4}\s\d{4}\s\d{4}\b', address)[0]
+    address = re.sub(r'\s+', ' ', address).strip()[:300]
+
+    pin_match = re.search(r'\b(\d{6})\b', address)
+    return {
+        "address": address,
+        "pincode": pin_match.group(1) if pin_match else ""
+    }
+
+def process_back_side(back_image_pil, do_qr_check=True, deadline=NO_DEADLINE):
+    """Back-side stage: Secure QR decoding and address OCR."""
+    back = {"qr_data": None, "address": "", "pincode": "", "skipped_checks": []}
+
+    if do_qr_check and PYAADHAAR_AVAILABLE:
+        if deadline.allows(QR_MIN_SECONDS):
+            back_np = np.array(back_image_pil)
+            back["qr_data"] = decode_secure_qr(cv2.cvtColor(back_np, cv2.COLOR_RGB2BGR))
+        else:
+            back["skipped_checks"].append({"check": "qr_code", "reason": "deadline"})
+
+    if TESSERACT_AVAILABLE and not deadline.allows(OCR_MIN_SECONDS):
+        back["skipped_checks"].append({"check": "address_ocr", "reason": "deadline"})
+    elif TESSERACT_AVAILABLE:
+        try:
+            back_text = pytesseract.image_to_string(
+                preprocess_for_ocr_full(back_image_pil), config="--psm 6", timeout=deadline.timeout(10)
+            )
+            back.update(extract_address_from_text(back_text))
+        except Exception as e:
+            print(f"⚠️ Back-side OCR failed: {e}")
+
+    return back
+
+def _normalize_alpha(text):
+    return re.sub(r'[^a-z]', '', str(text or "").lower())
+
+def _normalize_digits(text):
+    return re.sub(r'\D', '', str(text or ""))
+
+def cross_check_fields(extracted, qr_data, back_address=None):
     """
-    Complete Aadhaar verification pipeline - JSON serializable version
+    Compare front-side OCR fields against the Secure QR payload and the
+    back-side address. Returns (score_delta, indicators, checks).
     """
-    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # If YOLO is not available, return basic analysis
-    if not YOLO_AVAILABLE:
-        return {
-            "error": "MODEL_UNAVAILABLE",
-            "message": "YOLO model not available - running in basic mode",
-            "assessment": "UNKNOWN",
-            "fraud_score": 0,
-            "filename": f"single_{int(datetime.datetime.now().timestamp())}",
-            "timestamp": ts,
-            "indicators": ["⚠️ Running in basic mode - YOLO not available"]
-        }
-    
-    # --- Verify if image is actually an Aadhaar card ---
-    is_aadhaar, aadhaar_confidence, aadhaar_verification_details = is_aadhaar_image(front_bytes)
-    
-    if not is_aadhaar:
-        return {
-            "error": "NOT_AADHAAR",
-            "message": "The uploaded image does not appear to be an Aadhaar card",
-            "aadhaar_verification_details": aadhaar_verification_details,
-            "confidence_score": aadhaar_confidence,
-            "timestamp": ts,
-            "filename": f"single_{int(datetime.datetime.now().timestamp())}",
-            "assessment": "INVALID_INPUT"
-        }
-    
-    # Load models
-    try:
-    # ✅ Load your fine-tuned Aadhaar YOLO model (best.pt)
-        if model_path and os.path.exists(model_path):
-            custom_model = YOLO(model_path)
-            custom_model.to("cpu")
+    score = 0
+    indicators = []
+    checks = {}
+
+    def record(field, ok, weight, mismatch_code, label):
+        nonlocal score
+        checks[field] = "match" if ok else "mismatch"
+        if ok:
+            indicators.append(Indicator(IndicatorCode.QR_FIELD_MATCH, {"label": label}))
         else:
-            # Fallback to MODEL_PATH environment variable (set in app.py)
-            custom_model_path = os.environ.get("MODEL_PATH", os.path.join("backend", "models", "best.pt"))
-            custom_model = YOLO(custom_model_path)
-            custom_model.to("cpu")
-    # ✅ Load general YOLO model (yolov8n.pt) for face detection
-        face_model_path = os.environ.get("FACE_MODEL_PATH", os.path.join("backend", "models", "yolov8n.pt"))
-        general_model = YOLO(face_model_path)
-        general_model.to("cpu")
-
-    # ✅ Move both to selected device (CPU or GPU)
-        custom_model.to(device)
-        general_model.to(device)
+            score += weight
+            indicators.append(Indicator(mismatch_code))
+
+    # Aadhaar number: the Secure QR only carries the last four digits
+    qr_last4 = _normalize_digits(find_key_by_substr(qr_data, "last_4"))
+    ocr_num = _normalize_digits(extracted.get("aadhaar"))
+    if qr_last4 and len(ocr_num) >= 4:
+        record("aadhaar", ocr_num[-4:] == qr_last4[-4:], 3, IndicatorCode.QR_AADHAAR_MISMATCH, "Aadhaar number")
+    else:
+        checks["aadhaar"] = "unavailable"
+
+    qr_name = _normalize_alpha(qr_data.get("name"))
+    ocr_name = _normalize_alpha(extracted.get("name"))
+    if qr_name and ocr_name:
+        similar = SequenceMatcher(None, ocr_name, qr_name).ratio() >= 0.8
+        record("name", similar, 1, IndicatorCode.QR_NAME_MISMATCH, "Name")
+    else:
+        checks["name"] = "unavailable"
+
+    # QR dates are DD-MM-YYYY; the card may show only the year of birth
+    qr_dob = _normalize_digits(qr_data.get("dob"))
+    ocr_dob = _normalize_digits(extracted.get("dob"))
+    if qr_dob and ocr_dob:
+        same = qr_dob[-4:] == ocr_dob if len(ocr_dob) == 4 else qr_dob == ocr_dob
+        record("dob", same, 2, IndicatorCode.QR_DOB_MISMATCH, "Date of Birth")
+    else:
+        checks["dob"] = "unavailable"
 
+    qr_gender = _normalize_alpha(qr_data.get("gender"))[:1]
+    ocr_gender = _normalize_alpha(extracted.get("gender"))[:1]
+    if qr_gender and ocr_gender:
+        record("gender", qr_gender == ocr_gender, 1, IndicatorCode.QR_GENDER_MISMATCH, "Gender")
+    else:
+        checks["gender"] = "unavailable"
+
+    qr_pincode = _normalize_digits(find_key_by_substr(qr_data, "pincode"))
+    ocr_pincode = _normalize_digits((back_address or {}).get("pincode"))
+    if qr_pincode and ocr_pincode:
+        record("pincode", qr_pincode == ocr_pincode, 1, IndicatorCode.QR_PINCODE_MISMATCH, "Address PIN code")
+    else:
+        checks["pincode"] = "unavailable"
+
+    return score, indicators, checks
+
+# -------------------- SHARED CHECKS --------------------
+# Used by both the full pipeline and triage, so the two always score a card the same way
+def _model_unavailable_result(filename, ts):
+    return VerificationResult(
+        error="MODEL_UNAVAILABLE",
+        message="YOLO model not available - running in basic mode",
+        assessment="UNKNOWN",
+        fraud_score=0,
+        filename=filename,
+        timestamp=ts,
+        indicators=[Indicator(IndicatorCode.BASIC_MODE)]
+    )
+
+def _low_quality_result(quality, filename, ts):
+    return VerificationResult(
+        error="LOW_QUALITY",
+        message=f"Image quality too low for verification: {', '.join(quality['reasons'])}",
+        quality=quality,
+        timestamp=ts,
+        filename=filename,
+        assessment="LOW_QUALITY"
+    )
+
+def _add_number_indicator(results, number, not_read=False):
+    """Validate the OCR'd Aadhaar number (Verhoeff checksum included) and add its indicator."""
+    if VERIFICATION_RULES_AVAILABLE:
+        an_val = validate_aadhaar_number(number)
+    else:
+        an_val = "Valid" if number and len(number) >= 12 else "Missing"
+
+    if an_val == "Missing" and not_read:
+        results.add(IndicatorCode.AADHAAR_NOT_READ)
+    elif an_val == "Missing":
+        results.add(IndicatorCode.AADHAAR_MISSING, 2)
+    elif "Invalid" in an_val:
+        results.add(IndicatorCode.AADHAAR_INVALID, 3, value=number, status=an_val)
+    else:
+        results.add(IndicatorCode.AADHAAR_VALID, value=number)
+
+def _face_check(general_model, img_np, device="cpu", face_result=None):
+    """(fraud score, indicator) of face detection; ``face_result`` is a precomputed detection."""
+    try:
+        if face_result is None:
+            face_result = general_model(img_np, classes=[0], device=device, conf=0.4, verbose=False)[0]
+        if len(face_result.boxes) > 0:
+            return 0, Indicator(IndicatorCode.FACE_DETECTED)
+        return 3, Indicator(IndicatorCode.FACE_MISSING)
     except Exception as e:
-        device = "cpu"  # Fallback to CPU for safety
-        print(f"⚠️ Model loading error: {e}")
+        return 0, Indicator(IndicatorCode.FACE_DETECTION_FAILED)
 
-    # Convert bytes to PIL
-    front_image_pil = Image.open(io.BytesIO(front_bytes)).convert("RGB")
-    back_image_pil = Image.open(io.BytesIO(back_bytes)).convert("RGB") if back_bytes else None
-    
-    # Initialize results - ONLY JSON-SERIALIZABLE DATA
-    results = {
-        "fraud_score": 0,
-        "indicators": [],
-        "ocr_data": {},
-        "qr_data": {},
-        "assessment": "LOW",
-        "filename": f"single_{int(datetime.datetime.now().timestamp())}",
-        "timestamp": ts,
-        "extracted": {},
-        "back_image_qr_data": None,
-        "aadhaar_verification": {
-            "is_aadhaar_card": True,
-            "confidence_score": aadhaar_confidence,
-            "verification_details": aadhaar_verification_details
-        }
-    }
+# -------------------- MAIN PROCESSING --------------------
+# Fields read first when the budget is tight: the UID decides most verdicts
+FIELD_PRIORITY = ("number", "aadhaar", "dob", "date", "name", "gender")
+
+def _field_rank(label):
+    label = label.lower()
+    return next((i for i, key in enumerate(FIELD_PRIORITY) if key in label), len(FIELD_PRIORITY))
+
+def detect_front_batch(images_np, custom_model, general_model, device="cpu"):
+    """
+    Field and face detection for several front images in one YOLO call per model.
+    Returns one (field_result, face_result) pair per image.
+    """
+    field_results = custom_model(images_np, device=device, conf=0.25, verbose=False)
+    face_results = general_model(images_np, classes=[0], device=device, conf=0.4, verbose=False)
+    return list(zip(field_results, face_results))
+
+def field_crops(front_image_pil, field_result, names):
+    """Preprocessed OCR crops [(label, crop)] for the detected fields, most important first."""
+    crops = []
+    boxes = sorted(field_result.boxes, key=lambda b: _field_rank(names[int(b.cls[0])]))
+    for box in boxes:
+        class_id = int(box.cls[0])
+        label = names[class_id]
+
+        coords = box.xyxy[0].cpu().numpy().astype(int)
+        x1, y1, x2, y2 = coords
+
+        crop = front_image_pil.crop((x1, y1, x2, y2))
+        crops.append((label, preprocess_for_ocr(crop)))
+    return crops
+
+def process_front_side(front_image_pil, custom_model, general_model, device="cpu", deadline=NO_DEADLINE,
+                       detections=None, field_text=None):
+    """
+    Front-side stage: YOLO field detection, per-field OCR and face detection.
+    ``detections`` is a precomputed (field_result, face_result) pair from
+    ``detect_front_batch``; when given, the models are not called again.
+    ``field_text`` is precomputed {label: text} OCR (sheet montage), used
+    instead of reading the crops here.
+    """
+    front = {"ocr_data": {}, "fraud_score": 0, "indicators": [], "skipped_fields": [], "skipped_checks": []}
+    img_np = np.array(front_image_pil)
 
     # --- A: Front Image OCR & Bounding Boxes ---
     try:
-        img_np = np.array(front_image_pil)
-        yolo_results = custom_model(img_np, device=device, conf=0.25, verbose=False)
-        
-        # Create annotated image but don't store bytes in JSON
-        annotated_img = front_image_pil.copy()
-        draw = ImageDraw.Draw(annotated_img)
-        
+        if detections is not None:
+            yolo_results = [detections[0]]
+        else:
+            yolo_results = custom_model(img_np, device=device, conf=0.25, verbose=False)
+
         # Extract text from detected fields
-        if yolo_results[0].boxes:
-            for box in yolo_results[0].boxes:
-                class_id = int(box.cls[0])
-                label = custom_model.names[class_id]
-                
-                coords = box.xyxy[0].cpu().numpy().astype(int)
-                x1, y1, x2, y2 = coords
-
-                crop = front_image_pil.crop((x1, y1, x2, y2))
-                processed_crop = preprocess_for_ocr(crop)
-                text = ocr_text(processed_crop, label)
-
-                if text:
-                    results["ocr_data"][label] = text
-        
-        # Store annotation as base64 string if needed, but for now skip to avoid size
-        # We'll remove annotated_img_bytes entirely from JSON response
-        
+        if field_text is not None:
+            front["ocr_data"].update(field_text)
+        elif yolo_results[0].boxes:
+            crops = field_crops(front_image_pil, yolo_results[0], custom_model.names)
+            if OCR_MODE == "montage" and not deadline.allows(OCR_MIN_SECONDS):
+                front["skipped_fields"] = [label for label, _ in crops]
+            elif OCR_MODE == "montage":
+                texts = ocr_fields_montage([(i, label, crop) for i, (label, crop) in enumerate(crops)], deadline)
+                for i, (label, _) in enumerate(crops):
+                    if i in texts:
+                        front["ocr_data"][label] = texts[i]
+            else:
+                for label, processed_crop in crops:
+                    if not deadline.allows(OCR_MIN_SECONDS):
+                        front["skipped_fields"].append(label)
+                        continue
+                    text = ocr_text(processed_crop, label, deadline)
+                    if text:
+                        front["ocr_data"][label] = text
+
+            if front["skipped_fields"]:
+                front["skipped_checks"].append({
+                    "check": "field_ocr", "reason": "deadline", "fields": front["skipped_fields"]
+                })
+
     except Exception as e:
-        results["fraud_score"] += 5
-        results["indicators"].append("🔴 HIGH: Error in field detection.")
+        front["fraud_score"] += 5
+        front["indicators"].append(Indicator(IndicatorCode.FIELD_DETECTION_ERROR))
 
     # --- B: Face Detection ---
+    if not deadline.allows(FACE_MIN_SECONDS):
+        front["skipped_checks"].append({"check": "face_detection", "reason": "deadline"})
+        front["indicators"].append(Indicator(IndicatorCode.FACE_SKIPPED))
+        return front
+
+    face_score, face_indicator = _face_check(
+        general_model, img_np, device, detections[1] if detections is not None else None
+    )
+    front["fraud_score"] += face_score
+    front["indicators"].append(face_indicator)
+    return front
+
+def process_single_image_bytes(front_bytes, back_bytes=None, do_qr_check=False, model_path=None, device="cpu",
+                               deadline=NO_DEADLINE, as_model=False, mode="full"):
+    """
+    Complete Aadhaar verification pipeline - JSON serializable version.
+
+    Returns the legacy result dict, or the VerificationResult itself when
+    ``as_model`` is set (for callers that serialize compact views).
+
+    When ``back_bytes`` is given, the back side (Secure QR + address OCR) is
+    processed concurrently with the front side and the two are cross-checked.
+
+    Unusable scans (blurred, badly exposed, glare, too small) are rejected
+    as ``LOW_QUALITY`` by a millisecond-scale check before any OCR or YOLO.
+
+    ``deadline`` bounds the whole request: every stage gets the remaining
+    budget and optional stages are skipped (and listed in ``skipped_checks``)
+    when it runs short.
+
+    ``mode="triage"`` only answers HIGH / not HIGH from the front side (see
+    ``triage_card_image``); the back side is not read.
+    """
+    # Convert bytes to PIL at a bounded resolution (oversized camera JPEGs are decoded reduced)
     try:
-        face_results = general_model(img_np, classes=[0], device=device, conf=0.4, verbose=False)
-        if len(face_results[0].boxes) > 0:
-            results["indicators"].append("✅ LOW: Face detected on card.")
-        else:
-            results["fraud_score"] += 3
-            results["indicators"].append("🔴 HIGH: No face detected on the card.")
+        front_image_pil = decode_image(front_bytes)
+        back_image_pil = decode_image(back_bytes) if back_bytes and mode != "triage" else None
     except Exception as e:
-        results["indicators"].append("⚠️ Face detection failed.")
+        return _undecodable_result(e, as_model)
+    if mode == "triage":
+        return triage_card_image(front_image_pil, model_path, device, deadline, as_model,
+                                 has_back=bool(back_bytes), do_qr_check=do_qr_check)
+    return verify_card_image(front_image_pil, back_image_pil, do_qr_check, model_path, device, deadline, as_model)
+
+def not_aadhaar_result(details, confidence, ts=None):
+    """Result for an upload that is not an Aadhaar card (including files that aren't images at all)."""
+    return VerificationResult(
+        error="NOT_AADHAAR",
+        message="The uploaded image does not appear to be an Aadhaar card",
+        aadhaar_verification_details=details,
+        confidence_score=confidence,
+        timestamp=ts or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        filename=f"single_{int(datetime.datetime.now().timestamp())}",
+        assessment="INVALID_INPUT"
+    )
+
+def _undecodable_result(error, as_model):
+    # Not an image, or a corrupt one: reported like any other non-Aadhaar upload
+    result = not_aadhaar_result({"error": str(error)}, 0)
+    return result if as_model else result.to_dict()
+
+def front_gates(front_image_pil, deadline=NO_DEADLINE, ts=None):
+    """
+    Quality gate, then the Aadhaar gate, on a front image. Returns
+    (rejection, gates): a LOW_QUALITY / NOT_AADHAAR result and None, or None
+    and the (quality, aadhaar_confidence, aadhaar_details) of a passing card.
+    """
+    ts = ts or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # --- Quality gate: reject unusable scans before paying for OCR/YOLO ---
+    quality = assess_image_quality(front_image_pil) if QUALITY_GATE_ENABLED else None
+    if quality and not quality["ok"]:
+        return _low_quality_result(quality, f"single_{int(datetime.datetime.now().timestamp())}", ts), None
+
+    # --- Verify if image is actually an Aadhaar card ---
+    is_aadhaar, aadhaar_confidence, aadhaar_verification_details = is_aadhaar_image(front_image_pil, deadline)
+    if not is_aadhaar:
+        return not_aadhaar_result(aadhaar_verification_details, aadhaar_confidence, ts), None
+    return None, (quality, aadhaar_confidence, aadhaar_verification_details)
+
+def verify_card_image(front_image_pil, back_image_pil=None, do_qr_check=False, model_path=None, device="cpu",
+                      deadline=NO_DEADLINE, as_model=False, models=None, detections=None, field_text=None,
+                      gates=None):
+    """
+    Verification pipeline on already decoded images (see ``process_single_image_bytes``).
+
+    ``models`` is the ModelSet to use (default: the registry's active one) and
+    ``detections`` a precomputed YOLO pair for the front; callers verifying
+    several cards at once pass both so models are loaded and run only once,
+    plus ``field_text`` when the field OCR was also done for all cards at once.
+    ``gates`` is the outcome of ``front_gates`` when the caller already ran them.
+    """
+    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    finish = (lambda r: r) if as_model else (lambda r: r.to_dict())
+
+    # Take the active models once: a hot reload mid-request won't change them under us
+    if YOLO_AVAILABLE:
+        models = models or model_registry.active(model_path, device)
+
+    # If YOLO is not available (or the model failed to load), return basic analysis
+    if not YOLO_AVAILABLE or models is None:
+        return finish(_model_unavailable_result(f"single_{int(datetime.datetime.now().timestamp())}", ts))
+
+    if gates is None:
+        rejection, gates = front_gates(front_image_pil, deadline, ts)
+        if rejection is not None:
+            return finish(rejection)
+    quality, aadhaar_confidence, aadhaar_verification_details = gates
+
+    # --- Start the back side once the front passed its gates, so it overlaps the front pipeline ---
+    # Started any earlier, a rejected card would leave its Tesseract calls running past the response.
+    # Tesseract runs out-of-process and torch releases the GIL, so a thread is enough.
+    back_executor = None
+    back_future = None
+    if back_image_pil is not None:
+        back_executor = ThreadPoolExecutor(max_workers=1)
+        back_future = back_executor.submit(process_back_side, back_image_pil, do_qr_check, deadline)
+
+    # Without OCR the gate only checked the aspect ratio
+    if aadhaar_verification_details.get("ocr_skipped") == "deadline":
+        gate_skipped = [{"check": "aadhaar_detection", "reason": "deadline"}]
+    else:
+        gate_skipped = []
+
+    custom_model, general_model, device = models.custom, models.general, models.device
+
+    # Initialize results - ONLY JSON-SERIALIZABLE DATA
+    results = VerificationResult.new_card(f"single_{int(datetime.datetime.now().timestamp())}", ts)
+    results.aadhaar_verification = {
+        "is_aadhaar_card": True,
+        "confidence_score": aadhaar_confidence,
+        "verification_details": aadhaar_verification_details
+    }
+    if quality:
+        results.quality = quality
+    results.model_version = models.version
+    results.skipped_checks.extend(gate_skipped)
+
+    # --- A/B: Field OCR and face detection on the front ---
+    img_np = np.array(front_image_pil)
+    model_registry.shadow(img_np)
+    front = process_front_side(front_image_pil, custom_model, general_model, device, deadline, detections, field_text)
+    results.ocr_data = front["ocr_data"]
+    results.fraud_score += front["fraud_score"]
+    results.indicators.extend(front["indicators"])
+    results.skipped_checks.extend(front["skipped_checks"])
+
+    def field_skipped(*keys):
+        """True if a field was never read because the deadline ran out (not penalised as missing)."""
+        return any(key in label.lower() for label in front["skipped_fields"] for key in keys)
 
     # --- C: Data Extraction and Validation ---
-    ocr_aadhaar_num = find_key_by_substr(results["ocr_data"], "number")
-    ocr_name = find_key_by_substr(results["ocr_data"], "name")
-    ocr_gender = find_key_by_substr(results["ocr_data"], "gender")
-    
+    ocr_aadhaar_num = find_key_by_substr(results.ocr_data, "number")
+    ocr_name = find_key_by_substr(results.ocr_data, "name")
+    ocr_gender = find_key_by_substr(results.ocr_data, "gender")
+
     # Extract DOB with cleaning
     raw_dob_text = ""
-    for key, value in results["ocr_data"].items():
+    for key, value in results.ocr_data.items():
         if "dob" in key.lower() or "date" in key.lower():
             raw_dob_text = value
             break
@@ -408,7 +746,7 @@ def process_single_image_bytes(front_bytes, back_bytes=None, do_qr_check=False,
     ocr_aadhaar_num = correct_aadhaar_number(ocr_aadhaar_num)
 
     # Store extracted data
-    results["extracted"] = {
+    results.extracted = {
         "name": ocr_name,
         "dob": ocr_dob,
         "gender": ocr_gender,
@@ -417,111 +755,347 @@ def process_single_image_bytes(front_bytes, back_bytes=None, do_qr_check=False,
 
     # Validation checks with fallbacks
     if VERIFICATION_RULES_AVAILABLE:
-        an_val = validate_aadhaar_number(ocr_aadhaar_num)
         name_val = validate_name(ocr_name)
         dob_val = validate_dob(ocr_dob)
         gender_val = validate_gender(ocr_gender)
     else:
         # Basic validation without verification_rules
-        an_val = "Valid" if ocr_aadhaar_num and len(ocr_aadhaar_num) >= 12 else "Missing"
         name_val = "Valid" if ocr_name and len(ocr_name) >= 2 else "Missing"
         dob_val = "Valid" if ocr_dob else "Missing"
         gender_val = "Valid" if ocr_gender else "Missing"
 
     # Update fraud score based on validation
-    if an_val == "Missing":
-        results["fraud_score"] += 2
-        results["indicators"].append("🔴 HIGH: Aadhaar number is missing.")
-    elif "Invalid" in an_val:
-        results["fraud_score"] += 3
-        results["indicators"].append(f"🔴 HIGH: Aadhaar number '{ocr_aadhaar_num}' is {an_val}.")
-    else:
-        results["indicators"].append(f"✅ LOW: Aadhaar number '{ocr_aadhaar_num}' is valid.")
+    _add_number_indicator(results, ocr_aadhaar_num, not_read=field_skipped("number", "aadhaar"))
 
-    if name_val == "Missing":
-        results["fraud_score"] += 1
-        results["indicators"].append("🟡 MEDIUM: Name is missing.")
+    if name_val == "Missing" and field_skipped("name"):
+        results.add(IndicatorCode.NAME_NOT_READ)
+    elif name_val == "Missing":
+        results.add(IndicatorCode.NAME_MISSING, 1)
     elif "Invalid" in name_val:
-        results["fraud_score"] += 1
-        results["indicators"].append(f"🟡 MEDIUM: Name '{ocr_name}' is {name_val}.")
+        results.add(IndicatorCode.NAME_INVALID, 1, value=ocr_name, status=name_val)
     else:
-        results["indicators"].append(f"✅ LOW: Name '{ocr_name}' format is valid.")
+        results.add(IndicatorCode.NAME_VALID, value=ocr_name)
 
-    if dob_val == "Missing":
-        results["fraud_score"] += 1
-        results["indicators"].append(f"🟡 MEDIUM: Date of Birth is missing.")
+    if dob_val == "Missing" and field_skipped("dob", "date"):
+        results.add(IndicatorCode.DOB_NOT_READ)
+    elif dob_val == "Missing":
+        results.add(IndicatorCode.DOB_MISSING, 1)
     elif "Invalid" in dob_val:
-        results["fraud_score"] += 2
-        results["indicators"].append(f"🔴 HIGH: DOB '{ocr_dob}' is {dob_val}.")
+        results.add(IndicatorCode.DOB_INVALID, 2, value=ocr_dob, status=dob_val)
     else:
-        results["indicators"].append(f"✅ LOW: DOB '{ocr_dob}' format is valid.")
+        results.add(IndicatorCode.DOB_VALID, value=ocr_dob)
 
-    if gender_val == "Missing":
-        results["fraud_score"] += 1
-        results["indicators"].append("🟡 MEDIUM: Gender is missing.")
+    if gender_val == "Missing" and field_skipped("gender"):
+        results.add(IndicatorCode.GENDER_NOT_READ)
+    elif gender_val == "Missing":
+        results.add(IndicatorCode.GENDER_MISSING, 1)
     elif "Invalid" in gender_val:
-        results["fraud_score"] += 1
-        results["indicators"].append(f"🟡 MEDIUM: Gender '{ocr_gender}' is {gender_val}.")
+        results.add(IndicatorCode.GENDER_INVALID, 1, value=ocr_gender, status=gender_val)
     else:
-        results["indicators"].append(f"✅ LOW: Gender '{ocr_gender}' format is valid.")
+        results.add(IndicatorCode.GENDER_VALID, value=ocr_gender)
 
     # --- D: QR Code Verification ---
-    if do_qr_check and PYAADHAAR_AVAILABLE:
+    back = None
+    if back_future is not None:
         try:
-            image_np_bgr_front = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
-            qr_data_front = decode_secure_qr(image_np_bgr_front)
-            
-            if "error" not in qr_data_front:
-                results["qr_data"] = qr_data_front
-                results["indicators"].append("✅ LOW: Secure QR Code decoded successfully.")
+            back = back_future.result(timeout=deadline.wait_timeout())
+        except FuturesTimeoutError:
+            results.skipped_checks.append({"check": "back_side", "reason": "deadline"})
+        back_executor.shutdown(wait=False, cancel_futures=True)
+    if back is not None:
+        results.back_ocr = {"address": back["address"], "pincode": back["pincode"]}
+        results.skipped_checks.extend(back["skipped_checks"])
+
+    qr_skipped = any(c["check"] in ("qr_code", "back_side") for c in results.skipped_checks)
+    if do_qr_check and PYAADHAAR_AVAILABLE and back is None and not deadline.allows(QR_MIN_SECONDS):
+        results.skipped_checks.append({"check": "qr_code", "reason": "deadline"})
+        qr_skipped = True
+
+    if do_qr_check and qr_skipped:
+        results.add(IndicatorCode.QR_SKIPPED)
+    elif do_qr_check and PYAADHAAR_AVAILABLE:
+        try:
+            if back is not None:
+                # The Secure QR is printed on the back of the card
+                qr_data = back["qr_data"] or {"error": "QR Code not found or could not be read"}
+                if "error" not in qr_data:
+                    results.back_image_qr_data = to_jsonable(qr_data)
+            else:
+                image_np_bgr_front = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
+                qr_data = decode_secure_qr(image_np_bgr_front)
+                if "error" not in qr_data:
+                    results.qr_data = to_jsonable(qr_data)
+
+            if "error" not in qr_data:
+                results.add(IndicatorCode.QR_DECODED)
+
+                # --- E: Cross-field consistency between OCR and QR ---
+                cross_score, cross_indicators, cross_checks = cross_check_fields(
+                    results.extracted, qr_data, back
+                )
+                results.fraud_score += cross_score
+                results.indicators.extend(cross_indicators)
+                results.cross_checks = cross_checks
             else:
-                results["indicators"].append(f"⚠️ QR Code: {qr_data_front.get('error')}")
+                results.add(IndicatorCode.QR_ERROR, error=qr_data.get('error'))
         except Exception as e:
-            results["indicators"].append("⚠️ QR decoding error.")
+            results.add(IndicatorCode.QR_DECODING_ERROR)
     else:
-        results["indicators"].append("⚪ INFO: QR Code check was disabled.")
+        results.add(IndicatorCode.QR_DISABLED)
+
+    finalize_assessment(results)
+    return finish(results)
+
+def _essential_check_skipped(skipped_checks):
+    """True if the deadline cut the Aadhaar gate's OCR, the UID OCR or face detection."""
+    for check in skipped_checks:
+        if check.get("reason") != "deadline":
+            continue
+        if check["check"] in ESSENTIAL_CHECKS:
+            return True
+        if check["check"] == "field_ocr" and any(
+            "number" in label.lower() or "aadhaar" in label.lower() for label in check.get("fields", [])
+        ):
+            return True
+    return False
 
-    # Final assessment
-    if results["fraud_score"] >= 3:
-        results["assessment"] = "HIGH"
-    elif results["fraud_score"] >= 1:
-        results["assessment"] = "MODERATE"
+def finalize_assessment(results):
+    """
+    Map the fraud score to HIGH / MODERATE / LOW. A result cut short by the
+    deadline before an essential check is INCOMPLETE rather than MODERATE/LOW:
+    skipped checks add no penalty, so its score says nothing about the card.
+    HIGH stands either way, since further checks can only add to the score.
+    """
+    if results.fraud_score >= HIGH_RISK_SCORE:
+        results.assessment = "HIGH"
+    elif _essential_check_skipped(results.skipped_checks):
+        results.assessment = "INCOMPLETE"
+        results.add(IndicatorCode.INCOMPLETE_ASSESSMENT)
+    elif results.fraud_score >= 1:
+        results.assessment = "MODERATE"
     else:
-        results["assessment"] = "LOW"
-        if not any(ind.startswith("🔴") or ind.startswith("🟡") for ind in results["indicators"]):
-             results["indicators"].append("✅ LOW: All checks passed.")
-
-    # Ensure all data is JSON serializable
-    def make_serializable(obj):
-        if isinstance(obj, (np.integer, np.floating)):
-            return int(obj) if isinstance(obj, np.integer) else float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, (bytes, bytearray)):
-            return "<binary_data>"
-        elif hasattr(obj, '__dict__'):
-            return {k: make_serializable(v) for k, v in obj.__dict__.items()}
-        elif isinstance(obj, dict):
-            return {k: make_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, (list, tuple)):
-            return [make_serializable(item) for item in obj]
+        results.assessment = "LOW"
+        if results.skipped_checks:
+            results.add(IndicatorCode.PARTIAL_ASSESSMENT)
+        elif not any(ind.severity in ("HIGH", "MEDIUM") for ind in results.indicators):
+            results.add(IndicatorCode.ALL_CHECKS_PASSED)
+
+# -------------------- TRIAGE --------------------
+# Triage checks, cheapest first, with the most each can add to the fraud score
+TRIAGE_CHECKS = (
+    ("uid_field_detection", 2),
+    ("number_ocr", 3),
+    ("face_detection", 3),
+)
+# Front checks of the full pipeline that triage never runs; the follow-up verification covers them
+TRIAGE_DEFERRED = ("aadhaar_detection", "name_ocr", "dob_ocr", "gender_ocr")
+
+def _verdict_settled(score, remaining):
+    """True once the remaining checks can no longer move the card across the HIGH threshold."""
+    if score >= HIGH_RISK_SCORE:
+        return True
+    return score + sum(max_score for _, max_score in remaining) < HIGH_RISK_SCORE
+
+def triage_card_image(front_image_pil, model_path=None, device="cpu", deadline=NO_DEADLINE, as_model=False,
+                      models=None, has_back=False, do_qr_check=False):
+    """
+    Fast HIGH / not-HIGH verdict for high-volume intake.
+
+    Runs the cheapest checks first (quality gate, UID field detection, OCR
+    of the number field with the Verhoeff checksum, face detection) and
+    stops as soon as the card is HIGH or the remaining checks together could
+    no longer make it HIGH. Checks that were not run are listed in
+    ``skipped_checks``; a full verification of the same image completes the
+    report. ``has_back`` and ``do_qr_check`` describe the request, so the
+    back side and QR code are only listed when the follow-up would run them.
+    """
+    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    finish = (lambda r: r) if as_model else (lambda r: r.to_dict())
+    filename = f"triage_{int(datetime.datetime.now().timestamp())}"
+
+    if YOLO_AVAILABLE:
+        models = models or model_registry.active(model_path, device)
+    if not YOLO_AVAILABLE or models is None:
+        return finish(_model_unavailable_result(filename, ts))
+
+    quality = assess_image_quality(front_image_pil) if QUALITY_GATE_ENABLED else None
+    if quality and not quality["ok"]:
+        return finish(_low_quality_result(quality, filename, ts))
+
+    custom_model, general_model, device = models.custom, models.general, models.device
+
+    results = VerificationResult.new_card(filename, ts)
+    results.mode = "triage"
+    if quality:
+        results.quality = quality
+    results.model_version = models.version
+    deferred = list(TRIAGE_DEFERRED)
+    if has_back:
+        deferred.append("back_side")
+    if do_qr_check and PYAADHAAR_AVAILABLE:
+        deferred.append("qr_code")
+    results.skipped_checks.extend({"check": check, "reason": "triage"} for check in deferred)
+    img_np = np.array(front_image_pil)
+    remaining = list(TRIAGE_CHECKS)
+
+    def settled():
+        if not _verdict_settled(results.fraud_score, remaining):
+            return False
+        results.skipped_checks.extend({"check": check, "reason": "verdict_settled"} for check, _ in remaining)
+        return True
+
+    # --- 1: UID field detection ---
+    remaining.pop(0)
+    number_box = None
+    try:
+        field_result = custom_model(img_np, device=device, conf=0.25, verbose=False)[0]
+        number_box = next((box for box in field_result.boxes
+                           if "number" in custom_model.names[int(box.cls[0])].lower()), None)
+        if number_box is None:
+            results.add(IndicatorCode.AADHAAR_MISSING, 2)
+            remaining.pop(0)  # nothing to read
+            results.skipped_checks.append({"check": "number_ocr", "reason": "no_field"})
+    except Exception as e:
+        results.add(IndicatorCode.FIELD_DETECTION_ERROR, 5)
+        remaining.pop(0)
+        results.skipped_checks.append({"check": "number_ocr", "reason": "no_field"})
+
+    # --- 2: Number field OCR + Verhoeff checksum ---
+    if remaining and remaining[0][0] == "number_ocr" and not settled():
+        remaining.pop(0)
+        label = custom_model.names[int(number_box.cls[0])]
+        if deadline.allows(OCR_MIN_SECONDS):
+            x1, y1, x2, y2 = number_box.xyxy[0].cpu().numpy().astype(int)
+            text = ocr_text(preprocess_for_ocr(front_image_pil.crop((x1, y1, x2, y2))), label, deadline)
+            results.ocr_data = {label: text} if text else {}
+            number = correct_aadhaar_number(text)
+            results.extracted = {"aadhaar": number}
+            _add_number_indicator(results, number)
         else:
-            return obj
+            results.skipped_checks.append({"check": "number_ocr", "reason": "deadline"})
+            results.add(IndicatorCode.AADHAAR_NOT_READ)
 
-    return make_serializable(results)
+    # --- 3: Face detection ---
+    if remaining and not settled():
+        remaining.pop(0)
+        if deadline.allows(FACE_MIN_SECONDS):
+            face_score, face_indicator = _face_check(general_model, img_np, device)
+            results.fraud_score += face_score
+            results.indicators.append(face_indicator)
+        else:
+            results.skipped_checks.append({"check": "face_detection", "reason": "deadline"})
+            results.add(IndicatorCode.FACE_SKIPPED)
+
+    finalize_assessment(results)
+    return finish(results)
+
+# -------------------- SHEET PROCESSING --------------------
+def process_sheet_bytes(sheet_bytes, do_qr_check=False, model_path=None, device="cpu", deadline=NO_DEADLINE,
+                        as_model=False):
+    """
+    Verify every card on a scanned multi-card sheet (e.g. several cards on one A4 scan).
+
+    Card regions are located and perspective-corrected, and each goes
+    through the quality and Aadhaar gates first. Field and face detection
+    then run as one batched YOLO call per model for the cards that passed
+    (and, in montage OCR mode, one Tesseract pass for all their fields)
+    before validation. Returns one result per card in reading order, tagged
+    with ``sheet_position``. A page without any card-shaped region is
+    verified as a single card.
+    """
+    finish = (lambda rs: rs) if as_model else (lambda rs: [r.to_dict() for r in rs])
+    try:
+        sheet_pil = decode_image(sheet_bytes, max_dim=SHEET_IMAGE_MAX_DIM)
+    except Exception as e:
+        return finish([_undecodable_result(e, as_model=True)])
+
+    models = model_registry.active(model_path, device) if YOLO_AVAILABLE else None
+    cards = split_sheet(sheet_pil) if models is not None else []
+    if not cards:
+        return finish([verify_card_image(sheet_pil, None, do_qr_check, model_path, device, deadline, as_model=True)])
+
+    print(f"🗂️ Found {len(cards)} cards on sheet")
+    custom_model, general_model, device = models.custom, models.general, models.device
+
+    def deadline_skipped():
+        return VerificationResult(
+            error="DEADLINE_EXCEEDED",
+            message="Sheet deadline reached before this card was processed",
+            assessment="SKIPPED"
+        )
+
+    # Gates first: blurred and non-card crops never reach the batched YOLO/OCR
+    records = [None] * len(cards)
+    passed = []
+    for n, (_, card_pil) in enumerate(cards):
+        if deadline.expired():
+            records[n] = deadline_skipped()
+            continue
+        rejection, gates = front_gates(card_pil, deadline)
+        if rejection is not None:
+            records[n] = rejection
+        else:
+            passed.append((n, gates))
+
+    detections = [None] * len(passed)
+    if passed:
+        try:
+            detections = detect_front_batch(
+                [np.array(cards[n][1]) for n, _ in passed], custom_model, general_model, device
+            )
+        except Exception as e:
+            print(f"⚠️ Batched detection failed, falling back to per-card detection: {e}")
+
+    # Montage mode: every field of every passing card in one Tesseract pass
+    field_texts = [None] * len(passed)
+    if OCR_MODE == "montage" and passed and detections[0] is not None and deadline.allows(OCR_MIN_SECONDS):
+        crops = [
+            ((i, label), label, crop)
+            for i, ((n, _), card_detections) in enumerate(zip(passed, detections))
+            for label, crop in field_crops(cards[n][1], card_detections[0], custom_model.names)
+        ]
+        texts = ocr_fields_montage(crops, deadline)
+        field_texts = [{} for _ in passed]
+        for key, label, _ in crops:
+            if key in texts:
+                field_texts[key[0]][label] = texts[key]
+
+    for (n, gates), card_detections, field_text in zip(passed, detections, field_texts):
+        if deadline.expired():
+            records[n] = deadline_skipped()
+        else:
+            records[n] = verify_card_image(
+                cards[n][1], None, do_qr_check, model_path, device, deadline, as_model=True,
+                models=models, detections=card_detections, field_text=field_text, gates=gates
+            )
+
+    stamp = int(datetime.datetime.now().timestamp())
+    for (position, _), rec in zip(cards, records):
+        rec.filename = f"sheet_{stamp}_card{position['index'] + 1}"
+        rec.sheet_position = position
+    return finish(records)
 
 # -------------------- BATCH PROCESSING --------------------
-# -------------------- BATCH PROCESSING --------------------
-def process_zip_bytes(zip_bytes, model_path=None, do_qr_check=False, device="cpu", max_files=None):
-    """Process multiple images from ZIP file with memory management and Render-safe OCR"""
+def process_zip_bytes(zip_bytes, model_path=None, do_qr_check=False, device="cpu", max_files=None,
+                      deadline=NO_DEADLINE, as_model=False):
+    """
+    Process multiple images from ZIP file with memory management and Render-safe OCR.
+
+    All cards share ``deadline``; once it expires the remaining files are
+    returned as ``DEADLINE_EXCEEDED`` instead of being processed. With
+    ``as_model`` the VerificationResult objects are returned unserialized.
+    """
     results = []
+    success_count = 0
+    error_count = 0
     
     if not YOLO_AVAILABLE:
-        return [{
-            "error": "MODEL_UNAVAILABLE",
-            "message": "YOLO model not available",
-            "assessment": "UNKNOWN"
-        }]
+        results = [VerificationResult(
+            error="MODEL_UNAVAILABLE",
+            message="YOLO model not available",
+            assessment="UNKNOWN"
+        )]
+        return results if as_model else [r.to_dict() for r in results]
     
     try:
         with zipfile.ZipFile(io.BytesIO(zip_bytes), "r") as z:
@@ -536,12 +1110,20 @@ def process_zip_bytes(zip_bytes, model_path=None, do_qr_check=False, device="cpu
             print(f"📦 Processing {len(members)} images from ZIP file")
             
             processed_count = 0
-            success_count = 0
-            error_count = 0
             
             for name in members:
                 try:
                     processed_count += 1
+                    if deadline.expired():
+                        error_count += 1
+                        results.append(VerificationResult(
+                            filename=name,
+                            error="DEADLINE_EXCEEDED",
+                            message="Batch deadline reached before this file was processed",
+                            assessment="SKIPPED"
+                        ))
+                        continue
+
                     with z.open(name) as f:
                         img_bytes = f.read()
 
@@ -550,40 +1132,27 @@ def process_zip_bytes(zip_bytes, model_path=None, do_qr_check=False, device="cpu
                     # ✅ Render memory safety: skip files over ~6 MB
                     if len(img_bytes) > 6 * 1024 * 1024:
                         print(f"⚠️ Skipping {name} - too large ({len(img_bytes)/1024/1024:.2f} MB)")
-                        results.append({
-                            "filename": name,
-                            "error": "TOO_LARGE",
-                            "message": "File exceeds safe size limit for Render free tier",
-                            "assessment": "SKIPPED"
-                        })
-                        error_count += 1
-                        continue
-
-                    # ✅ Verify if it's an Aadhaar image first (with downscaling + timeout safety)
-                    is_aadhaar, confidence, details = is_aadhaar_image(img_bytes)
-
-                    if not is_aadhaar:
+                        results.append(VerificationResult(
+                            filename=name,
+                            error="TOO_LARGE",
+                            message="File exceeds safe size limit for Render free tier",
+                            assessment="SKIPPED"
+                        ))
                         error_count += 1
-                        results.append({
-                            "filename": name,
-                            "error": "NOT_AADHAAR",
-                            "message": "The image does not appear to be an Aadhaar card", 
-                            "confidence_score": confidence,
-                            "aadhaar_verification_details": details,
-                            "assessment": "INVALID_INPUT"
-                        })
                         continue
 
-                    # ✅ Process as Aadhaar card (Render-safe)
+                    # ✅ Quality gate, Aadhaar check and full pipeline (Render-safe)
                     rec = process_single_image_bytes(
                         img_bytes, 
                         back_bytes=None, 
                         do_qr_check=do_qr_check, 
                         model_path=model_path, 
-                        device=device
+                        device=device,
+                        deadline=deadline,
+                        as_model=True
                     )
 
-                    rec["filename"] = name
+                    rec.filename = name
 
                     if rec.get("error"):
                         error_count += 1
@@ -596,26 +1165,24 @@ def process_zip_bytes(zip_bytes, model_path=None, do_qr_check=False, device="cpu
 
                     # ✅ Memory cleanup between files
                     import gc
-                    import time
-                    time.sleep(0.5)
                     gc.collect()
 
                 except Exception as e:
                     error_count += 1
                     print(f"❌ [{processed_count}/{len(members)}] Error processing {name}: {str(e)}")
-                    results.append({
-                        "filename": name,
-                        "error": f"Processing error: {str(e)}",
-                        "assessment": "ERROR"
-                    })
+                    results.append(VerificationResult(
+                        filename=name,
+                        error=f"Processing error: {str(e)}",
+                        assessment="ERROR"
+                    ))
 
     except Exception as e:
         print(f"❌ ZIP processing failed: {str(e)}")
-        results.append({
-            "filename": "batch_processing", 
-            "error": f"ZIP processing failed: {str(e)}",
-            "assessment": "ERROR"
-        })
+        results.append(VerificationResult(
+            filename="batch_processing", 
+            error=f"ZIP processing failed: {str(e)}",
+            assessment="ERROR"
+        ))
     
     print(f"📊 Batch processing complete: {success_count} successful, {error_count} errors out of {len(results)} files")
-    return results
+    return results if as_model else [r.to_dict() for r in results]
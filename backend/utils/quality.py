@@ -0,0 +1,128 @@
+# backend/utils/quality.py
+import os
+
+import cv2
+import numpy as np
+
+# Metrics are computed on a copy whose long side is at most this many pixels
+QUALITY_MAX_DIM = int(os.environ.get("QUALITY_MAX_DIM", 512))
+
+# Thresholds (tuned for the downscaled copy)
+BLUR_MIN_VARIANCE = float(os.environ.get("QUALITY_BLUR_MIN_VARIANCE", 40))
+DARK_MAX_FRACTION = float(os.environ.get("QUALITY_DARK_MAX_FRACTION", 0.6))
+BRIGHT_MAX_FRACTION = float(os.environ.get("QUALITY_BRIGHT_MAX_FRACTION", 0.6))
+UNDEREXPOSED_MEAN = float(os.environ.get("QUALITY_UNDEREXPOSED_MEAN", 45))
+GLARE_MAX_FRACTION = float(os.environ.get("QUALITY_GLARE_MAX_FRACTION", 0.05))
+# A glare blob must be surrounded by card surface at least this bright and this much darker than the blob
+GLARE_SURROUND_MIN = float(os.environ.get("QUALITY_GLARE_SURROUND_MIN", 150))
+GLARE_MIN_CONTRAST = float(os.environ.get("QUALITY_GLARE_MIN_CONTRAST", 12))
+# Minimum width of the ring sampled around each blob, relative to the long side (grows with blob size)
+GLARE_RING_FRACTION = 0.03
+MIN_EFFECTIVE_RESOLUTION = int(os.environ.get("QUALITY_MIN_RESOLUTION", 300))
+
+QUALITY_GATE_ENABLED = os.environ.get("QUALITY_GATE_ENABLED", "true").lower() == "true"
+
+def _downscale(image_pil):
+    """
+    Cheap box-filter reduction to at most QUALITY_MAX_DIM on the long side.
+    Rounding the factor up keeps larger images within (QUALITY_MAX_DIM / 2,
+    QUALITY_MAX_DIM], the scale the thresholds were tuned for.
+    """
+    factor = -(-max(image_pil.size) // QUALITY_MAX_DIM)
+    small = image_pil.reduce(factor) if factor > 1 else image_pil
+    return np.asarray(small.convert("RGB"))
+
+def _glare_fraction(rgb):
+    """
+    Share of the image covered by specular highlights: blown-out, colourless
+    blobs that don't touch the border and are clearly brighter than the card
+    surface around them. A clipped white card on a dark table is surrounded
+    by the table, not by card, so it is not glare.
+    """
+    hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)
+    value = hsv[..., 2]
+    mask = ((value >= 250) & (hsv[..., 1] <= 30)).astype(np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if count <= 1:
+        return 0.0
+
+    h, w = mask.shape
+    glare_area = 0
+    for label in range(1, count):
+        x, y, bw, bh, area = stats[label]
+        # Border-touching regions are scanner background, not specular glare
+        if x == 0 or y == 0 or x + bw >= w or y + bh >= h or area < 0.002 * h * w:
+            continue
+        # Wide enough to reach past the soft halo around a highlight
+        ring_width = max(3, int(GLARE_RING_FRACTION * max(h, w)), int(np.sqrt(area / np.pi)))
+        x0, y0 = max(0, x - ring_width), max(0, y - ring_width)
+        x1, y1 = min(w, x + bw + ring_width), min(h, y + bh + ring_width)
+        outside = (labels[y0:y1, x0:x1] != label).astype(np.uint8)
+        # Distance to the blob: linear-time, unlike dilating with a blob-sized kernel
+        distance = cv2.distanceTransform(outside, cv2.DIST_L2, 3)
+        ring = (outside > 0) & (distance <= ring_width)
+        surround = float(np.median(value[y0:y1, x0:x1][ring]))
+        # A highlight sits on card surface that is bright but not itself clipped
+        if GLARE_SURROUND_MIN <= surround <= 255 - GLARE_MIN_CONTRAST:
+            glare_area += area
+    return float(glare_area) / (h * w)
+
+def _effective_resolution(gray, original_size):
+    """Short side, in original pixels, of the region that actually holds detail."""
+    edges = cv2.Canny(gray, 50, 150)
+    ys, xs = np.nonzero(edges)
+    if len(xs) < 50:
+        return 0
+
+    scale = max(original_size) / max(gray.shape)
+    width = (np.percentile(xs, 99) - np.percentile(xs, 1)) * scale
+    height = (np.percentile(ys, 99) - np.percentile(ys, 1)) * scale
+    return int(min(width, height))
+
+def assess_image_quality(image_pil):
+    """
+    Fast usability check run before any OCR or model inference.
+
+    Returns {"ok", "reasons", "metrics"} where reasons are codes among
+    BLURRY, UNDEREXPOSED, OVEREXPOSED, GLARE and LOW_RESOLUTION.
+    """
+    rgb = _downscale(image_pil)
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+
+    blur_variance = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+    hist = np.bincount(gray.ravel(), minlength=256) / gray.size
+    dark_fraction = float(hist[:16].sum())
+    bright_fraction = float(hist[250:].sum())
+    mean_brightness = float(np.dot(hist, np.arange(256)))
+
+    glare_fraction = _glare_fraction(rgb)
+    effective_resolution = _effective_resolution(gray, image_pil.size)
+
+    reasons = []
+    if blur_variance < BLUR_MIN_VARIANCE:
+        reasons.append("BLURRY")
+    if dark_fraction > DARK_MAX_FRACTION or mean_brightness < UNDEREXPOSED_MEAN:
+        reasons.append("UNDEREXPOSED")
+    if bright_fraction > BRIGHT_MAX_FRACTION:
+        reasons.append("OVEREXPOSED")
+    if glare_fraction > GLARE_MAX_FRACTION:
+        reasons.append("GLARE")
+    if effective_resolution < MIN_EFFECTIVE_RESOLUTION:
+        reasons.append("LOW_RESOLUTION")
+
+    return {
+        "ok": not reasons,
+        "reasons": reasons,
+        "metrics": {
+            "blur_variance": round(blur_variance, 1),
+            "mean_brightness": round(mean_brightness, 1),
+            "dark_fraction": round(dark_fraction, 3),
+            "bright_fraction": round(bright_fraction, 3),
+            "glare_fraction": round(glare_fraction, 3),
+            "effective_resolution": effective_resolution,
+            "image_size": list(image_pil.size),
+        }
+    }
@@ -0,0 +1,56 @@
+# backend/utils/request_log.py
+"""
+Optional recorder of verification traffic, for replay with ``python -m backend.loadtest``.
+
+One JSON line per verification request with anonymized metadata only:
+endpoint, options, upload sizes, card count, status, outcome and server-side
+duration. No file names, client addresses or image content are stored.
+"""
+import json
+import os
+import threading
+import time
+
+REQUEST_LOG_ENABLED = os.environ.get("REQUEST_LOG_ENABLED", "false").lower() == "true"
+REQUEST_LOG_PATH = os.environ.get("REQUEST_LOG_PATH", os.path.join("backend", "requests.jsonl"))
+
+# Only these endpoints are recorded; they are what the load generator replays
+RECORDED_PATHS = ("/api/verify_single", "/api/verify_dual", "/api/verify_sheet", "/api/verify_batch")
+
+_lock = threading.Lock()
+
+def outcome_for(status):
+    if status == 429:
+        return "rejected"
+    if status == 413:
+        return "too_large"
+    if status >= 500:
+        return "error"
+    if status >= 400:
+        return "client_error"
+    return "ok"
+
+def should_record(method, path):
+    return REQUEST_LOG_ENABLED and method == "POST" and path in RECORDED_PATHS
+
+def record_request(path, status, duration_ms, request_bytes=0, files=None, cards=None, mode=None, qr=False):
+    """Append one request to the trace. Never raises."""
+    entry = {
+        "ts": round(time.time(), 3),
+        "path": path,
+        "mode": mode,
+        "qr": qr,
+        "status": status,
+        "outcome": outcome_for(status),
+        "duration_ms": round(duration_ms, 1),
+        "request_bytes": request_bytes,
+        "files": files or [],
+        "cards": cards,
+    }
+    line = json.dumps(entry) + "\n"
+    try:
+        with _lock:
+            with open(REQUEST_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError as e:
+        print(f"⚠️ Request log write failed: {e}")
@@ -0,0 +1,231 @@
+# backend/utils/result_model.py
+import json
+from enum import Enum
+
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# -------------------- INDICATOR CODES --------------------
+class IndicatorCode(str, Enum):
+    """Stable machine-readable indicator codes; human text lives in INDICATOR_CATALOG."""
+    BASIC_MODE = "BASIC_MODE"
+    FIELD_DETECTION_ERROR = "FIELD_DETECTION_ERROR"
+    FACE_DETECTED = "FACE_DETECTED"
+    FACE_MISSING = "FACE_MISSING"
+    FACE_DETECTION_FAILED = "FACE_DETECTION_FAILED"
+    FACE_SKIPPED = "FACE_SKIPPED"
+    AADHAAR_VALID = "AADHAAR_VALID"
+    AADHAAR_MISSING = "AADHAAR_MISSING"
+    AADHAAR_INVALID = "AADHAAR_INVALID"
+    AADHAAR_NOT_READ = "AADHAAR_NOT_READ"
+    NAME_VALID = "NAME_VALID"
+    NAME_MISSING = "NAME_MISSING"
+    NAME_INVALID = "NAME_INVALID"
+    NAME_NOT_READ = "NAME_NOT_READ"
+    DOB_VALID = "DOB_VALID"
+    DOB_MISSING = "DOB_MISSING"
+    DOB_INVALID = "DOB_INVALID"
+    DOB_NOT_READ = "DOB_NOT_READ"
+    GENDER_VALID = "GENDER_VALID"
+    GENDER_MISSING = "GENDER_MISSING"
+    GENDER_INVALID = "GENDER_INVALID"
+    GENDER_NOT_READ = "GENDER_NOT_READ"
+    QR_DECODED = "QR_DECODED"
+    QR_ERROR = "QR_ERROR"
+    QR_DECODING_ERROR = "QR_DECODING_ERROR"
+    QR_DISABLED = "QR_DISABLED"
+    QR_SKIPPED = "QR_SKIPPED"
+    QR_FIELD_MATCH = "QR_FIELD_MATCH"
+    QR_AADHAAR_MISMATCH = "QR_AADHAAR_MISMATCH"
+    QR_NAME_MISMATCH = "QR_NAME_MISMATCH"
+    QR_DOB_MISMATCH = "QR_DOB_MISMATCH"
+    QR_GENDER_MISMATCH = "QR_GENDER_MISMATCH"
+    QR_PINCODE_MISMATCH = "QR_PINCODE_MISMATCH"
+    PARTIAL_ASSESSMENT = "PARTIAL_ASSESSMENT"
+    INCOMPLETE_ASSESSMENT = "INCOMPLETE_ASSESSMENT"
+    ALL_CHECKS_PASSED = "ALL_CHECKS_PASSED"
+
+SEVERITY_PREFIX = {
+    "LOW": "✅ LOW: ",
+    "MEDIUM": "🟡 MEDIUM: ",
+    "HIGH": "🔴 HIGH: ",
+    "INFO": "⚪ INFO: ",
+    "WARNING": "⚠️ ",
+}
+
+# code -> (severity, message template)
+INDICATOR_CATALOG = {
+    IndicatorCode.BASIC_MODE: ("WARNING", "Running in basic mode - YOLO not available"),
+    IndicatorCode.FIELD_DETECTION_ERROR: ("HIGH", "Error in field detection."),
+    IndicatorCode.FACE_DETECTED: ("LOW", "Face detected on card."),
+    IndicatorCode.FACE_MISSING: ("HIGH", "No face detected on the card."),
+    IndicatorCode.FACE_DETECTION_FAILED: ("WARNING", "Face detection failed."),
+    IndicatorCode.FACE_SKIPPED: ("INFO", "Face detection skipped (deadline reached)."),
+    IndicatorCode.AADHAAR_VALID: ("LOW", "Aadhaar number '{value}' is valid."),
+    IndicatorCode.AADHAAR_MISSING: ("HIGH", "Aadhaar number is missing."),
+    IndicatorCode.AADHAAR_INVALID: ("HIGH", "Aadhaar number '{value}' is {status}."),
+    IndicatorCode.AADHAAR_NOT_READ: ("INFO", "Aadhaar number not read (deadline reached)."),
+    IndicatorCode.NAME_VALID: ("LOW", "Name '{value}' format is valid."),
+    IndicatorCode.NAME_MISSING: ("MEDIUM", "Name is missing."),
+    IndicatorCode.NAME_INVALID: ("MEDIUM", "Name '{value}' is {status}."),
+    IndicatorCode.NAME_NOT_READ: ("INFO", "Name not read (deadline reached)."),
+    IndicatorCode.DOB_VALID: ("LOW", "DOB '{value}' format is valid."),
+    IndicatorCode.DOB_MISSING: ("MEDIUM", "Date of Birth is missing."),
+    IndicatorCode.DOB_INVALID: ("HIGH", "DOB '{value}' is {status}."),
+    IndicatorCode.DOB_NOT_READ: ("INFO", "Date of Birth not read (deadline reached)."),
+    IndicatorCode.GENDER_VALID: ("LOW", "Gender '{value}' format is valid."),
+    IndicatorCode.GENDER_MISSING: ("MEDIUM", "Gender is missing."),
+    IndicatorCode.GENDER_INVALID: ("MEDIUM", "Gender '{value}' is {status}."),
+    IndicatorCode.GENDER_NOT_READ: ("INFO", "Gender not read (deadline reached)."),
+    IndicatorCode.QR_DECODED: ("LOW", "Secure QR Code decoded successfully."),
+    IndicatorCode.QR_ERROR: ("WARNING", "QR Code: {error}"),
+    IndicatorCode.QR_DECODING_ERROR: ("WARNING", "QR decoding error."),
+    IndicatorCode.QR_DISABLED: ("INFO", "QR Code check was disabled."),
+    IndicatorCode.QR_SKIPPED: ("INFO", "QR Code check skipped (deadline reached)."),
+    IndicatorCode.QR_FIELD_MATCH: ("LOW", "{label} matches Secure QR data."),
+    IndicatorCode.QR_AADHAAR_MISMATCH: ("HIGH", "Aadhaar number does not match Secure QR data."),
+    IndicatorCode.QR_NAME_MISMATCH: ("MEDIUM", "Name does not match Secure QR data."),
+    IndicatorCode.QR_DOB_MISMATCH: ("HIGH", "Date of Birth does not match Secure QR data."),
+    IndicatorCode.QR_GENDER_MISMATCH: ("MEDIUM", "Gender does not match Secure QR data."),
+    IndicatorCode.QR_PINCODE_MISMATCH: ("MEDIUM", "Address PIN code does not match Secure QR data."),
+    IndicatorCode.PARTIAL_ASSESSMENT: ("INFO", "Some checks were skipped - assessment is partial."),
+    IndicatorCode.INCOMPLETE_ASSESSMENT: ("WARNING", "Essential checks were skipped (deadline reached) - card not cleared."),
+    IndicatorCode.ALL_CHECKS_PASSED: ("LOW", "All checks passed."),
+}
+
+def indicator_catalog():
+    """Code -> {severity, template}, for clients that render compact results themselves."""
+    return {
+        code.value: {"severity": severity, "template": SEVERITY_PREFIX[severity] + template}
+        for code, (severity, template) in INDICATOR_CATALOG.items()
+    }
+
+class Indicator:
+    """One fraud indicator: an enumerated code plus the values its message needs."""
+    __slots__ = ("code", "params")
+
+    def __init__(self, code, params=None):
+        self.code = IndicatorCode(code)
+        self.params = params
+
+    @property
+    def severity(self):
+        return INDICATOR_CATALOG[self.code][0]
+
+    def render(self):
+        severity, template = INDICATOR_CATALOG[self.code]
+        text = template.format(**self.params) if self.params else template
+        return SEVERITY_PREFIX[severity] + text
+
+# -------------------- VERIFICATION RESULT --------------------
+_UNSET = object()
+
+# Legacy response keys, in the order the API has always emitted them
+RESULT_FIELDS = (
+    "error", "message", "fraud_score", "indicators", "ocr_data", "qr_data", "assessment",
+    "filename", "timestamp", "extracted", "back_image_qr_data", "back_ocr", "cross_checks",
+    "skipped_checks", "confidence_score", "aadhaar_verification_details", "aadhaar_verification",
+    "quality", "sheet_position", "model_version", "mode",
+)
+
+# Debug-only payloads dropped in compact mode
+COMPACT_DROP = ("ocr_data", "aadhaar_verification_details")
+
+class VerificationResult:
+    """
+    Result of verifying one card. Fields left unset are omitted from the
+    response, so error results keep their short legacy shape.
+    """
+    __slots__ = RESULT_FIELDS
+
+    def __init__(self, **fields):
+        for name in RESULT_FIELDS:
+            setattr(self, name, fields.pop(name, _UNSET))
+        if fields:
+            raise TypeError(f"Unknown result fields: {', '.join(fields)}")
+
+    @classmethod
+    def new_card(cls, filename, timestamp):
+        """Empty result for a card that passed the Aadhaar gate."""
+        return cls(
+            fraud_score=0, indicators=[], ocr_data={}, qr_data={}, assessment="LOW",
+            filename=filename, timestamp=timestamp, extracted={}, back_image_qr_data=None,
+            skipped_checks=[],
+        )
+
+    def add(self, code, score=0, **params):
+        """Append an indicator and add its weight to the fraud score."""
+        self.indicators.append(Indicator(code, params or None))
+        if score:
+            self.fraud_score += score
+
+    def get(self, name, default=None):
+        """Dict-style read access, for callers written against the legacy dict results."""
+        value = getattr(self, name, _UNSET) if name in RESULT_FIELDS else _UNSET
+        return default if value is _UNSET else value
+
+    def to_dict(self, compact=False, fields=None):
+        """
+        Plain-dict view for JSON. The default is the legacy shape with rendered
+        indicator text; ``compact`` swaps text for codes and drops debug payloads;
+        ``fields`` keeps only the named top-level keys (indicators may be
+        requested as either ``indicators`` or ``indicator_codes``).
+        """
+        if fields and "indicator_codes" in fields:
+            fields = set(fields) | {"indicators"}
+        out = {}
+        for name in RESULT_FIELDS:
+            if fields and name not in fields:
+                continue
+            value = getattr(self, name)
+            if value is _UNSET or (compact and name in COMPACT_DROP):
+                continue
+            if name == "indicators":
+                if compact:
+                    out["indicator_codes"] = [ind.code.value for ind in value]
+                    continue
+                value = [ind.render() for ind in value]
+            elif name == "aadhaar_verification" and compact:
+                value = {k: v for k, v in value.items() if k != "verification_details"}
+            out[name] = value
+        return out
+
+def result_to_dict(result, compact=False, fields=None):
+    """Serialize a VerificationResult view; plain dicts (fallback paths) pass through."""
+    return result.to_dict(compact, fields) if isinstance(result, VerificationResult) else result
+
+def results_to_dicts(results, compact=False, fields=None):
+    return [result_to_dict(r, compact, fields) for r in results]
+
+# -------------------- JSON ENCODING --------------------
+def to_jsonable(obj):
+    """Recursively convert untrusted payloads (e.g. decoded QR data) to JSON-safe types."""
+    if isinstance(obj, (np.integer, np.floating)):
+        return int(obj) if isinstance(obj, np.integer) else float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, (bytes, bytearray)):
+        return "<binary_data>"
+    elif isinstance(obj, dict):
+        return {k: to_jsonable(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [to_jsonable(item) for item in obj]
+    elif hasattr(obj, '__dict__'):
+        return {k: to_jsonable(v) for k, v in obj.__dict__.items()}
+    return obj
+
+def _json_default(obj):
+    if isinstance(obj, VerificationResult):
+        return obj.to_dict()
+    return to_jsonable(obj)
+
+def dumps(payload):
+    """Serialize a response payload to UTF-8 JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
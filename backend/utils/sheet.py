@@ -0,0 +1,150 @@
+# backend/utils/sheet.py
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# ID-1 card format: 85.60 x 53.98 mm
+CARD_ASPECT = 85.60 / 53.98
+
+# Sheets are decoded up to this long side (~300 dpi A4); each card keeps ~1000 px of width
+SHEET_IMAGE_MAX_DIM = int(os.environ.get("SHEET_IMAGE_MAX_DIM", 3600))
+
+# Contour detection runs on a copy whose long side is at most this many pixels
+SHEET_DETECT_MAX_DIM = int(os.environ.get("SHEET_DETECT_MAX_DIM", 1600))
+
+# A card region must cover this share of the page and be roughly card-shaped
+# (a card is ~7% of an A4 page)
+SHEET_MIN_AREA_FRACTION = float(os.environ.get("SHEET_MIN_AREA_FRACTION", 0.03))
+SHEET_MAX_AREA_FRACTION = float(os.environ.get("SHEET_MAX_AREA_FRACTION", 0.6))
+SHEET_ASPECT_TOLERANCE = float(os.environ.get("SHEET_ASPECT_TOLERANCE", 0.3))
+SHEET_MAX_CARDS = int(os.environ.get("SHEET_MAX_CARDS", 12))
+
+# Cards on one sheet are the same size; smaller regions are print blocks, not cards
+SHEET_MIN_RELATIVE_AREA = 0.5
+
+def _order_corners(pts):
+    """Corners as top-left, top-right, bottom-right, bottom-left."""
+    pts = np.asarray(pts, dtype=np.float32).reshape(4, 2)
+    s = pts.sum(axis=1)
+    d = np.diff(pts, axis=1).ravel()
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]], dtype=np.float32)
+
+def _card_quad(contour):
+    """Four-corner outline of a contour: the polygon approximation when it is a quad, else its min-area box."""
+    approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+    if len(approx) == 4 and cv2.isContourConvex(approx):
+        return _order_corners(approx)
+    return _order_corners(cv2.boxPoints(cv2.minAreaRect(contour)))
+
+def _quad_size(quad):
+    tl, tr, br, bl = quad
+    width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+    height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+    return width, height
+
+def _quad_area(quad):
+    width, height = _quad_size(quad)
+    return width * height
+
+def find_card_quads(image_np):
+    """
+    Locate card-shaped regions on a scanned page.
+
+    Cards stand out from the paper by their printed content and edges, so
+    edges are closed into solid blobs and each blob with a card-like aspect
+    ratio is kept (the scanner's page border, if any, is too large to
+    count). Returns quads in original-image coordinates.
+    """
+    h, w = image_np.shape[:2]
+    scale = min(1.0, SHEET_DETECT_MAX_DIM / max(h, w))
+    small = cv2.resize(image_np, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else image_np
+
+    gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(gray, 30, 100)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9))
+    mask = cv2.morphologyEx(cv2.dilate(edges, kernel), cv2.MORPH_CLOSE, kernel, iterations=2)
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    page_area = small.shape[0] * small.shape[1]
+
+    quads = []
+    for contour in contours:
+        # The hull bridges gaps in a card's edge outline
+        contour = cv2.convexHull(contour)
+        area = cv2.contourArea(contour)
+        if not SHEET_MIN_AREA_FRACTION * page_area <= area <= SHEET_MAX_AREA_FRACTION * page_area:
+            continue
+        quad = _card_quad(contour)
+        width, height = _quad_size(quad)
+        aspect = max(width, height) / max(1.0, min(width, height))
+        if abs(aspect - CARD_ASPECT) > SHEET_ASPECT_TOLERANCE * CARD_ASPECT:
+            continue
+        quads.append(quad / scale)
+
+    # Largest first; a region centred inside an already kept card is part of that card
+    quads.sort(key=_quad_area, reverse=True)
+    kept = []
+    for quad in quads:
+        if kept and _quad_area(quad) < SHEET_MIN_RELATIVE_AREA * _quad_area(kept[0]):
+            break
+        centre = tuple(float(v) for v in quad.mean(axis=0))
+        if not any(cv2.pointPolygonTest(k, centre, False) >= 0 for k in kept):
+            kept.append(quad)
+    return kept[:SHEET_MAX_CARDS]
+
+def rectify_card(image_np, quad):
+    """Perspective-correct one card region to a landscape, axis-aligned crop at native resolution."""
+    width, height = (int(round(v)) for v in _quad_size(quad))
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(quad.astype(np.float32), target)
+    card = cv2.warpPerspective(image_np, matrix, (width, height), flags=cv2.INTER_CUBIC)
+    # Cards placed sideways on the sheet come out portrait; the pipeline expects landscape
+    if height > width:
+        card = cv2.rotate(card, cv2.ROTATE_90_CLOCKWISE)
+    return card
+
+def _sheet_positions(quads):
+    """Reading-order (row, col) for each quad: rows are grouped by centre height."""
+    centres = [q.mean(axis=0) for q in quads]
+    row_tolerance = np.median([min(_quad_size(q)) for q in quads]) / 2
+
+    order = sorted(range(len(quads)), key=lambda i: centres[i][1])
+    rows = []
+    for i in order:
+        if rows and abs(centres[i][1] - np.mean([centres[j][1] for j in rows[-1]])) <= row_tolerance:
+            rows[-1].append(i)
+        else:
+            rows.append([i])
+
+    positions = {}
+    index = 0
+    for row, members in enumerate(rows):
+        for col, i in enumerate(sorted(members, key=lambda j: centres[j][0])):
+            x1, y1 = quads[i].min(axis=0)
+            x2, y2 = quads[i].max(axis=0)
+            positions[i] = {
+                "index": index, "row": row, "col": col,
+                "bbox": [int(x1), int(y1), int(x2), int(y2)],
+            }
+            index += 1
+    return positions
+
+def split_sheet(image_pil):
+    """
+    Split a scanned sheet into rectified card crops.
+
+    Returns a list of (position, card_pil) in reading order, where position
+    is {"index", "row", "col", "bbox"}. An empty list means no card-shaped
+    region was found.
+    """
+    image_np = np.asarray(image_pil.convert("RGB"))
+    quads = find_card_quads(image_np)
+    if not quads:
+        return []
+
+    positions = _sheet_positions(quads)
+    cards = [(positions[i], Image.fromarray(rectify_card(image_np, quad))) for i, quad in enumerate(quads)]
+    return sorted(cards, key=lambda card: card[0]["index"])
@@ -0,0 +1,169 @@
+# backend/utils/static_assets.py
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Pages reachable without the .html suffix; any other unknown path falls back to index.html
+PAGE_ROUTES = {
+    "": "index.html",
+    "index": "index.html",
+    "services": "services.html",
+    "about": "about.html",
+    "contact": "contact.html",
+}
+FALLBACK_PAGE = "index.html"
+# Missing files under these directories are a 404, not the fallback page
+NO_FALLBACK_PREFIXES = ("css/", "js/")
+
+# Files smaller than this, or whose compressed form isn't smaller, are only kept uncompressed
+PRECOMPRESS_MIN_BYTES = 256
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Fingerprinted URLs (?v=<hash>) never change content; everything else is revalidated
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# src="..." / href="..." attributes in HTML pages; css/js references are rewritten to fingerprinted URLs
+ASSET_REF = re.compile(r'''((?:src|href)=["'])([^"'?#:]+)(["'])''')
+
+class Asset:
+    """One file from frontend/, held in memory with its precompressed variants."""
+    __slots__ = ("path", "content_type", "version", "variants")
+
+    def __init__(self, path, content_type, data):
+        self.path = path
+        self.content_type = content_type
+        self.version = hashlib.sha256(data).hexdigest()[:16]
+        # encoding -> (body, strong ETag of that representation)
+        self.variants = {"identity": (data, f'"{self.version}"')}
+        if len(data) < PRECOMPRESS_MIN_BYTES or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return
+        compressed = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+        if BROTLI_AVAILABLE:
+            compressed["br"] = brotli.compress(data, quality=11)
+        for encoding, body in compressed.items():
+            if len(body) < len(data):
+                self.variants[encoding] = (body, f'"{self.version}-{encoding}"')
+
+def _accepted_encodings(accept_encoding):
+    """Encodings from an Accept-Encoding header with q > 0 (identity is always acceptable)."""
+    accepted = {"identity"}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+class StaticAssets:
+    """
+    In-memory index of the frontend, built once at startup.
+
+    Every file is read, hashed and precompressed (gzip, plus brotli when
+    installed) up front. HTML pages have their css/js references rewritten to
+    ``?v=<hash>`` URLs, so those assets can be cached forever while pages are
+    revalidated with a strong ETag. Serving is a dict lookup plus header
+    comparison - no filesystem access and no compression per request.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.assets = {}
+        self._build()
+
+    def _build(self):
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                full_path = os.path.join(directory, name)
+                path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    files[path] = f.read()
+
+        # Plain assets first, so pages can reference their fingerprints
+        for path, data in files.items():
+            if not path.endswith(".html"):
+                self.assets[path] = Asset(path, self._content_type(path), data)
+        for path, data in files.items():
+            if path.endswith(".html"):
+                html = self._fingerprint_refs(path, data.decode("utf-8"))
+                self.assets[path] = Asset(path, self._content_type(path), html.encode("utf-8"))
+        print(f"✅ Indexed {len(self.assets)} static assets (brotli: {BROTLI_AVAILABLE})")
+
+    @staticmethod
+    def _content_type(path):
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        return content_type
+
+    def _fingerprint_refs(self, page_path, html):
+        base = os.path.dirname(page_path)
+
+        def replace(match):
+            ref = match.group(2)
+            target = os.path.normpath(os.path.join(base, ref)).replace(os.sep, "/")
+            asset = self.assets.get(target)
+            # Links between pages stay plain: pages are always revalidated
+            if asset is None or target.endswith(".html"):
+                return match.group(0)
+            return f"{match.group(1)}{ref}?v={asset.version}{match.group(3)}"
+
+        return ASSET_REF.sub(replace, html)
+
+    def lookup(self, path):
+        """Resolve a request path (without the leading slash) to an Asset, or None for a 404."""
+        path = path.strip("/")
+        asset = self.assets.get(PAGE_ROUTES.get(path, path))
+        if asset is None and not path.startswith(NO_FALLBACK_PREFIXES):
+            asset = self.assets.get(FALLBACK_PAGE)
+        return asset
+
+    def respond(self, path, version=None, accept_encoding=None, if_none_match=None):
+        """
+        Response for a static request as (status, headers, body), or None when
+        there is no such asset. ``version`` is the ``v`` query parameter.
+        """
+        asset = self.lookup(path)
+        if asset is None:
+            return None
+
+        accepted = _accepted_encodings(accept_encoding)
+        encoding = next(e for e in ("br", "gzip", "identity") if e in asset.variants and e in accepted)
+        body, etag = asset.variants[encoding]
+
+        headers = [
+            ("ETag", etag),
+            ("Cache-Control", IMMUTABLE_CACHE if version == asset.version else REVALIDATE_CACHE),
+        ]
+        if len(asset.variants) > 1:
+            headers.append(("Vary", "Accept-Encoding"))
+        if _etag_matches(if_none_match, etag):
+            return 304, headers, b""
+
+        headers.append(("Content-Type", asset.content_type))
+        headers.append(("Content-Length", str(len(body))))
+        if encoding != "identity":
+            headers.append(("Content-Encoding", encoding))
+        return 200, headers, body
@@ -298,7 +298,7 @@ function displaySingleResult(result) {
     if (riskLevel === 'HIGH') {
         riskClass = 'risk-high';
         riskTagClass = 'risk-high-tag';
-    } else if (riskLevel === 'MODERATE') {
+    } else if (riskLevel === 'MODERATE' || riskLevel === 'INCOMPLETE') {
         riskClass = 'risk-medium';
         riskTagClass = 'risk-medium-tag';
     }
@@ -346,7 +346,7 @@ function showSingleFullDetails(result) {
     if (riskLevel === 'HIGH') {
         riskClass = 'risk-high';
         riskTagClass = 'risk-high-tag';
-    } else if (riskLevel === 'MODERATE') {
+    } else if (riskLevel === 'MODERATE' || riskLevel === 'INCOMPLETE') {
         riskClass = 'risk-medium';
         riskTagClass = 'risk-medium-tag';
     }
@@ -662,7 +662,7 @@ function showBatchFullDetails(results) {
                 riskTagClass = 'risk-high-tag';
             } else {
                 if (riskLevel === 'HIGH') riskTagClass = 'risk-high-tag';
-                else if (riskLevel === 'MODERATE') riskTagClass = 'risk-medium-tag';
+                else if (riskLevel === 'MODERATE' || riskLevel === 'INCOMPLETE') riskTagClass = 'risk-medium-tag';
             }
 
             const rowClass = index % 2 === 0 ? 'style="background: #f8f9fa;"' : 'style="background: white;"';
@@ -1203,7 +1203,7 @@ function displaySingleResult(result) {
     if (riskLevel === 'HIGH') {
         riskClass = 'risk-high';
         riskTagClass = 'risk-high-tag';
-    } else if (riskLevel === 'MODERATE') {
+    } else if (riskLevel === 'MODERATE' || riskLevel === 'INCOMPLETE') {
         riskClass = 'risk-medium';
         riskTagClass = 'risk-medium-tag';
     }
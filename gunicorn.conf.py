@@ -0,0 +1,11 @@
+# gunicorn.conf.py - loaded automatically by `gunicorn app:app`
+import os
+
+from backend.utils.admission import verification_threads
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+timeout = 300
+worker_class = "gthread"
+# One thread per admitted or queued verification plus a few for pages and health checks,
+# so excess requests get the admission 429 instead of waiting in gunicorn's backlog
+threads = int(os.environ.get("GUNICORN_THREADS", verification_threads() + 4))
@@ -0,0 +1,52 @@
+import threading
+import time
+
+import pytest
+
+from backend.utils.admission import AdmissionController, AdmissionRejected, busy_payload
+
+def test_admit_and_release():
+    controller = AdmissionController("test", capacity=2, max_queue=1, queue_timeout=1)
+    with controller.admit(1):
+        with controller.admit(1):
+            assert controller.stats()["in_flight"] == 2
+    stats = controller.stats()
+    assert stats["in_flight"] == 0
+    assert stats["admitted_total"] == 2
+
+def test_queued_request_is_admitted_when_capacity_frees():
+    controller = AdmissionController("test", capacity=1, max_queue=1, queue_timeout=2)
+    controller.acquire(1)
+    threading.Timer(0.05, controller.release, args=(1,)).start()
+    assert controller.acquire(1) == 1
+    assert controller.stats()["queue_depth"] == 0
+
+def test_queue_timeout_rejects():
+    controller = AdmissionController("test", capacity=1, max_queue=1, queue_timeout=0.05)
+    controller.acquire(1)
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire(1)
+    assert rejected.value.reason == "timeout"
+    assert controller.stats()["rejected"] == {"queue_full": 0, "timeout": 1}
+
+def test_saturated_rejects_with_retry_after():
+    controller = AdmissionController("test", capacity=1, max_queue=1, queue_timeout=5)
+    assert not controller.saturated()
+    controller.acquire(1)
+    # The one queue slot is still free
+    assert not controller.saturated()
+
+    waiter = threading.Thread(target=controller.acquire, args=(1,), daemon=True)
+    waiter.start()
+    while controller.stats()["queue_depth"] == 0:
+        time.sleep(0.01)
+    assert controller.saturated()
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire(1)
+    assert rejected.value.reason == "queue_full"
+
+    payload = busy_payload(controller)
+    assert payload["success"] is False
+    assert payload["retry_after"] >= 1
+    controller.release(1)
+    waiter.join(1)
@@ -0,0 +1,21 @@
+import pytest
+
+from backend.utils.deadline import CALL_MIN_SECONDS, CLIENT_MIN_SECONDS, Deadline
+
+def test_from_client_clamps_to_floor_and_maximum():
+    assert Deadline.from_client(0.01, default=45).budget == CLIENT_MIN_SECONDS
+    assert Deadline.from_client(-3, default=45).budget == CLIENT_MIN_SECONDS
+    assert Deadline.from_client(600, default=45).budget == 45
+    assert Deadline.from_client(600, default=45, maximum=120).budget == 120
+    assert Deadline.from_client("20", default=45).budget == 20
+
+@pytest.mark.parametrize("value", [None, "", "soon", "nan", float("nan")])
+def test_from_client_falls_back_to_default(value):
+    assert Deadline.from_client(value, default=45).budget == 45
+
+def test_timeout_is_never_zero():
+    expired = Deadline(0)
+    assert expired.expired()
+    assert expired.timeout(10) == CALL_MIN_SECONDS
+    assert Deadline(30).timeout(10) == 10
+    assert Deadline().timeout(10) == 10
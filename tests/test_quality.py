@@ -0,0 +1,44 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from backend.utils.quality import QUALITY_MAX_DIM, _downscale, assess_image_quality
+
+def _card_photo(card_brightness, glare_radius=None):
+    """An 856x540 card with text-like lines, photographed on a dark table."""
+    photo = Image.new("RGB", (1200, 800), (40, 40, 40))
+    card = Image.new("RGB", (856, 540), (card_brightness,) * 3)
+    draw = ImageDraw.Draw(card)
+    rng = np.random.default_rng(0)
+    for row in range(12):
+        for col in range(8):
+            x, y = 40 + col * 100, 40 + row * 40
+            draw.rectangle([x, y, x + int(rng.integers(30, 90)), y + 14], fill=(20, 20, 20))
+    if glare_radius:
+        # Clipped highlight with a soft falloff into the card surface
+        yy, xx = np.mgrid[:540, :856]
+        distance = np.hypot(xx - 400, yy - 270)
+        boost = np.clip((1.5 * glare_radius - distance) / (0.5 * glare_radius), 0, 1)
+        pixels = np.asarray(card, dtype=np.float32)
+        pixels += (255 - pixels) * boost[..., None]
+        card = Image.fromarray(pixels.astype(np.uint8))
+    photo.paste(card, (172, 130))
+    return photo
+
+def test_clean_white_card_is_not_glare():
+    quality = assess_image_quality(_card_photo(255))
+    assert quality["ok"], quality
+    assert quality["metrics"]["glare_fraction"] == 0
+
+def test_light_grey_card_passes():
+    assert assess_image_quality(_card_photo(245))["ok"]
+
+def test_specular_highlight_on_card_is_glare():
+    quality = assess_image_quality(_card_photo(230, glare_radius=130))
+    assert "GLARE" in quality["reasons"]
+
+def test_downscale_keeps_analysed_scale_in_band():
+    for long_side in (QUALITY_MAX_DIM + 1, 2 * QUALITY_MAX_DIM - 1, 2 * QUALITY_MAX_DIM, 3000, 4032):
+        small = _downscale(Image.new("RGB", (long_side, long_side * 2 // 3)))
+        assert QUALITY_MAX_DIM // 2 < max(small.shape[:2]) <= QUALITY_MAX_DIM, long_side
+    # Small images are analysed as they are
+    assert _downscale(Image.new("RGB", (400, 300))).shape[:2] == (300, 400)
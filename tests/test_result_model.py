@@ -0,0 +1,17 @@
+from backend.utils.result_model import IndicatorCode, VerificationResult
+
+def _result():
+    result = VerificationResult.new_card("card.jpg", "2026-01-01 00:00:00")
+    result.add(IndicatorCode.FACE_MISSING, 3)
+    return result
+
+def test_compact_fields_accept_either_indicator_name():
+    result = _result()
+    for name in ("indicators", "indicator_codes"):
+        out = result.to_dict(compact=True, fields={name, "fraud_score"})
+        assert out == {"fraud_score": 3, "indicator_codes": [IndicatorCode.FACE_MISSING.value]}
+
+def test_full_view_fields_keep_rendered_indicators():
+    out = _result().to_dict(fields={"indicators"})
+    assert list(out) == ["indicators"]
+    assert isinstance(out["indicators"][0], str)